@@ -1,74 +1,311 @@
 import os
+import re
+import sys
+import json
+import time
+import argparse
 import subprocess
 from pathlib import Path
 
-def check_repository_structure():
+EXPECTED_DIRS = [
+    "meetings/meetup-notes",
+    "meetings/templates",
+    "research/papers/2024",
+    "research/blogs/2024",
+    "research/tools/autogen",
+    "research/tools/langchain",
+    "research/tools/llamaindex",
+    "learning/books/aima-notes",
+    "learning/books/transformers-nlp-notes",
+    "learning/books/rag-notes",
+    "learning/courses",
+    "learning/tutorials",
+    "implementations/experiments",
+    "implementations/projects",
+    "implementations/examples",
+    "resources/tools/distil-whisper",
+    "resources/tools/insanely-fast-whisper",
+    "resources/communities",
+    "scripts"
+]
+
+# Directory listings from the previous run, keyed by path and mtime
+CACHE_FILE = '.check_repo_cache.json'
+CACHE_VERSION = 1
+# A directory changed this recently may change again within the same mtime
+# tick, so its listing is not cached (the "racy git" problem)
+RACY_SECONDS = 2
+
+
+def git_lines(root, *args):
+    """Run a git command with NUL-separated output; None if git or the repo is unavailable"""
+    try:
+        result = subprocess.run(['git', '-C', str(root), *args], capture_output=True)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return [item for item in result.stdout.decode('utf-8', 'surrogateescape').split('\0') if item]
+
+
+def find_repo_root():
+    """The top of the git work tree, or the current directory outside one"""
+    # rev-parse has no -z mode; the path ends with a single newline
+    result = git_lines('.', 'rev-parse', '--show-toplevel')
+    return Path(result[0][:-1]) if result else Path('.').resolve()
+
+
+def translate_glob(pattern):
+    """Translate a gitignore glob into a regular expression"""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append('[' + body.replace('\\', '\\\\') + ']')
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+
+def parse_ignore_file(path, base):
+    """Read ignore rules from a .gitignore-style file; `base` is its directory relative to the root"""
+    rules = []
+    try:
+        with open(path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        if not line.endswith('\\ '):
+            line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # A slash anywhere but the end ties the pattern to the file's directory
+        anchored = '/' in line
+        rules.append({
+            'base': base,
+            'regex': translate_glob(line.lstrip('/')),
+            'negate': negate,
+            'dir_only': dir_only,
+            'anchored': anchored
+        })
+    return rules
+
+
+def is_ignored(path, is_dir, rules):
+    """Apply ignore rules in order; the last matching rule wins, as in git"""
+    ignored = False
+    for rule in rules:
+        if rule['dir_only'] and not is_dir:
+            continue
+        base = rule['base']
+        relative = path[len(base) + 1:] if base else path
+        target = relative if rule['anchored'] else relative.rsplit('/', 1)[-1]
+        if rule['regex'].match(target):
+            ignored = not rule['negate']
+    return ignored
+
+
+def load_cache(root):
+    try:
+        with open(root / CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get('dirs', {}) if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(root, dirs):
+    path = root / CACHE_FILE
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'dirs': dirs}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write {CACHE_FILE}: {e}", file=sys.stderr)
+
+
+def scan_files(root, cached_dirs=None):
+    """List files under `root` that git would not ignore, reusing cached listings of unchanged directories.
+
+    A directory's mtime changes whenever an entry is added, removed or
+    renamed in it, so an unchanged mtime means the cached listing is still
+    right and the directory does not need to be read again. Ignore rules are
+    applied after listing, so editing a .gitignore takes effect immediately.
+    """
+    cached_dirs = cached_dirs or {}
+    new_cache = {}
+    files = []
+    stats = {'dirs_listed': 0, 'dirs_reused': 0}
+    racy_cutoff = time.time_ns() - RACY_SECONDS * 1_000_000_000
+    base_rules = parse_ignore_file(root / '.git' / 'info' / 'exclude', '')
+
+    stack = [('', base_rules)]
+    while stack:
+        rel_dir, rules = stack.pop()
+        abs_dir = root / rel_dir if rel_dir else root
+        try:
+            mtime = os.stat(abs_dir).st_mtime_ns
+        except OSError:
+            continue
+        cached = cached_dirs.get(rel_dir)
+        if cached and cached[0] == mtime:
+            entries = cached[1]
+            stats['dirs_reused'] += 1
+        else:
+            try:
+                with os.scandir(abs_dir) as it:
+                    entries = sorted([entry.name, entry.is_dir(follow_symlinks=False)] for entry in it)
+            except OSError:
+                continue
+            stats['dirs_listed'] += 1
+        if mtime < racy_cutoff:
+            new_cache[rel_dir] = [mtime, entries]
+
+        if any(name == '.gitignore' and not is_dir for name, is_dir in entries):
+            rules = rules + parse_ignore_file(abs_dir / '.gitignore', rel_dir)
+        for name, is_dir in entries:
+            path = f"{rel_dir}/{name}" if rel_dir else name
+            if name == '.git' or path in (CACHE_FILE, CACHE_FILE + '.tmp'):
+                continue
+            if is_ignored(path, is_dir, rules):
+                continue
+            if is_dir:
+                stack.append((path, rules))
+            else:
+                files.append(path)
+    return set(files), new_cache, stats
+
+
+def git_changes(root):
+    """Parse `git status --porcelain -z` for tracked files into a list of changes"""
+    items = git_lines(root, 'status', '--porcelain', '-z', '--untracked-files=no')
+    changes = []
+    items = iter(items or [])
+    for item in items:
+        change = {'status': item[:2], 'path': item[3:]}
+        # Renames and copies are followed by the original path
+        if item[0] in 'RC':
+            change['from'] = next(items, None)
+        changes.append(change)
+    return changes
+
+
+def check_expected_dirs(root):
+    results = []
+    for dir_path in EXPECTED_DIRS:
+        path = root / dir_path
+        results.append({
+            'path': dir_path,
+            'exists': path.is_dir(),
+            'readme': (path / "README.md").exists()
+        })
+    return results
+
+
+def build_report(use_cache=True):
+    """Collect tracked, on-disk and untracked files plus the expected-directory check"""
+    root = find_repo_root()
+    tracked = git_lines(root, 'ls-files', '-z')
+    tracked_files = set(tracked or [])
+    changes = git_changes(root) if tracked is not None else []
+
+    cached_dirs = load_cache(root) if use_cache else {}
+    scanned, new_cache, stats = scan_files(root, cached_dirs)
+    if use_cache:
+        save_cache(root, new_cache)
+
+    # Tracked files inside ignored directories are not scanned, so take them
+    # from the index unless git reports them deleted from the working tree
+    deleted = {change['path'] for change in changes if change['status'][1] == 'D'}
+    all_files = scanned | (tracked_files - deleted)
+
+    return {
+        'root': str(root),
+        'git': tracked is not None,
+        'tracked': sorted(tracked_files),
+        'files': sorted(all_files),
+        'untracked': sorted(all_files - tracked_files),
+        'changes': changes,
+        'expected_dirs': check_expected_dirs(root),
+        'scan': stats
+    }
+
+
+def check_repository_structure(use_cache=True, as_json=False):
     """Check and display repository file structure"""
-    
+    report = build_report(use_cache)
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return report
+
     print("=== Tracked Files (git ls-files) ===")
-    tracked = subprocess.run(['git', 'ls-files'], 
-                           capture_output=True, 
-                           text=True)
-    tracked_files = set(tracked.stdout.splitlines())
-    print("\n".join(tracked_files) or "No tracked files found")
-    
+    print("\n".join(report['tracked']) or "No tracked files found")
+
     print("\n=== All Files in Directory ===")
-    all_files = []
-    for root, dirs, files in os.walk('.'):
-        # Skip .git directory
-        if '.git' in dirs:
-            dirs.remove('.git')
-        # Skip venv directory if it exists
-        if 'venv' in dirs:
-            dirs.remove('venv')
-            
-        for file in files:
-            path = os.path.join(root, file)
-            # Convert to forward slashes for consistency
-            path = path.replace('\\', '/').lstrip('./')
-            all_files.append(path)
-    
-    all_files = set(all_files)
-    print("\n".join(sorted(all_files)) or "No files found")
-    
+    print("\n".join(report['files']) or "No files found")
+
     print("\n=== Files Not Tracked in Git ===")
-    untracked = all_files - tracked_files
-    print("\n".join(sorted(untracked)) or "All files are tracked")
-    
+    print("\n".join(report['untracked']) or "All files are tracked")
+
+    print("\n=== Changes to Tracked Files (git status) ===")
+    lines = []
+    for change in report['changes']:
+        if 'from' in change:
+            lines.append(f"{change['status']} {change['from']} -> {change['path']}")
+        else:
+            lines.append(f"{change['status']} {change['path']}")
+    print("\n".join(lines) or "No changes")
+
     print("\n=== Expected Directory Structure ===")
-    expected_dirs = [
-        "meetings/meetup-notes",
-        "meetings/templates",
-        "research/papers/2024",
-        "research/blogs/2024",
-        "research/tools/autogen",
-        "research/tools/langchain",
-        "research/tools/llamaindex",
-        "learning/books/aima-notes",
-        "learning/books/transformers-nlp-notes",
-        "learning/books/rag-notes",
-        "learning/courses",
-        "learning/tutorials",
-        "implementations/experiments",
-        "implementations/projects",
-        "implementations/examples",
-        "resources/tools/distil-whisper",
-        "resources/tools/insanely-fast-whisper",
-        "resources/communities",
-        "scripts"
-    ]
-    
     print("\nChecking expected directories...")
-    for dir_path in expected_dirs:
-        path = Path(dir_path)
-        if path.exists():
-            readme = path / "README.md"
-            if readme.exists():
-                print(f"✅ {dir_path} (with README)")
-            else:
-                print(f"⚠️  {dir_path} (missing README)")
+    for result in report['expected_dirs']:
+        if not result['exists']:
+            print(f"❌ {result['path']} (missing)")
+        elif result['readme']:
+            print(f"✅ {result['path']} (with README)")
         else:
-            print(f"❌ {dir_path} (missing)")
+            print(f"⚠️  {result['path']} (missing README)")
+
+    stats = report['scan']
+    print(f"\nScanned {stats['dirs_listed']} directories, reused {stats['dirs_reused']} from {CACHE_FILE}")
+    return report
+
 
 if __name__ == '__main__':
-    check_repository_structure()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Check the repository file structure')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--no-cache', action='store_true', help=f'Re-read every directory and leave {CACHE_FILE} alone')
+    args = parser.parse_args()
+    check_repository_structure(use_cache=not args.no_cache, as_json=args.json)
@@ -0,0 +1,129 @@
+# Local SQLite store for incremental arXiv fetching
+# Remembers the newest submission date seen per topic (the "watermark"),
+# the metadata of every paper already fetched, and a short-lived cache of
+# query results so repeated runs do not hit the arXiv API again.
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+DEFAULT_STORE_FILE = "arxiv_store.sqlite3"
+# Repeated queries inside this window are answered from the local cache
+DEFAULT_QUERY_TTL_SECONDS = 6 * 60 * 60
+
+
+# Helper function: The newest submission date among `papers`, or None
+def newest_published(papers):
+    published = [datetime.fromisoformat(p["published"]) for p in papers if p.get("published")]
+    return max(published) if published else None
+
+
+class ArxivStore:
+    def __init__(self, path=DEFAULT_STORE_FILE, query_ttl_seconds=DEFAULT_QUERY_TTL_SECONDS):
+        self.path = path
+        self.query_ttl_seconds = query_ttl_seconds
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS watermarks (
+                topic TEXT PRIMARY KEY,
+                newest_submitted TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS papers (
+                entry_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                published TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS query_cache (
+                topic TEXT NOT NULL,
+                max_results INTEGER NOT NULL,
+                entry_ids TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (topic, max_results)
+            );
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_watermark(self, topic):
+        """Return the newest submission datetime seen for `topic`, or None."""
+        row = self.conn.execute(
+            "SELECT newest_submitted FROM watermarks WHERE topic = ?", (topic,)
+        ).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def update_watermark(self, topic, newest_submitted):
+        """Move the watermark forward; older dates never move it back."""
+        current = self.get_watermark(topic)
+        if current is not None and current >= newest_submitted:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO watermarks (topic, newest_submitted) VALUES (?, ?)",
+            (topic, newest_submitted.isoformat()),
+        )
+        self.conn.commit()
+
+    def save_papers(self, papers):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO papers (entry_id, title, summary, published, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            [(p["url"], p["title"], p["summary"], p.get("published"), now) for p in papers],
+        )
+        self.conn.commit()
+
+    def get_papers(self, entry_ids):
+        """Return stored paper dicts for `entry_ids`, preserving their order."""
+        if not entry_ids:
+            return []
+        placeholders = ",".join("?" for _ in entry_ids)
+        rows = self.conn.execute(
+            f"SELECT entry_id, title, summary, published FROM papers WHERE entry_id IN ({placeholders})",
+            list(entry_ids),
+        ).fetchall()
+        by_id = {
+            row[0]: {"title": row[1], "summary": row[2], "url": row[0], "published": row[3]} for row in rows
+        }
+        return [by_id[entry_id] for entry_id in entry_ids if entry_id in by_id]
+
+    def get_cached_query(self, topic, max_results):
+        """Return the cached papers for this query if still fresh, else None."""
+        row = self.conn.execute(
+            "SELECT entry_ids, fetched_at FROM query_cache WHERE topic = ? AND max_results = ?",
+            (topic, max_results),
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.query_ttl_seconds:
+            return None
+        return self.get_papers(json.loads(row[0]))
+
+    def cache_query(self, topic, max_results, papers):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO query_cache (topic, max_results, entry_ids, fetched_at) VALUES (?, ?, ?, ?)",
+            (topic, max_results, json.dumps([p["url"] for p in papers]), time.time()),
+        )
+        self.conn.commit()
+
+    def record_search(self, topic, max_results, papers, move_watermark=True):
+        """Store a fresh search result: paper metadata, watermark and query cache.
+
+        Returns the newest submission date in `papers` (or None). With
+        `move_watermark=False` the watermark is left alone, so the caller can
+        move it with update_watermark once the papers were actually delivered.
+        """
+        self.save_papers(papers)
+        newest = newest_published(papers)
+        if newest is not None and move_watermark:
+            self.update_watermark(topic, newest)
+        self.cache_query(topic, max_results, papers)
+        return newest
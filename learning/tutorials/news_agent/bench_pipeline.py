@@ -0,0 +1,587 @@
+# End-to-end benchmark for news_agent.main(), fully offline
+# Runs the real pipeline against local stand-ins:
+#   - a fake `acompletion` with configurable latency and token counting
+#   - a fake arXiv feed with N synthetic papers per topic
+#   - a local HTTP server serving generated PDFs with P pages
+#   - a local SMTP sink that accepts the digest email
+# and reports wall-clock time, per-stage latency, peak memory and prompt
+# tokens for a grid of topic / paper / page counts.
+#
+# Usage: python bench_pipeline.py [--topics 1 2] [--papers 20 100] [--pages 5 20]
+#                                 [--json results.json] [--compare baseline.json]
+#                                 [--rate-limit-rate 0.2] [--digest-mode fused] [--readers 3]
+
+import argparse
+import asyncio
+import email
+import http.server
+import json
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import news_agent
+from profiles import make_profile
+from editor_rules import check_editor_rules
+
+CHARS_PER_TOKEN = 4
+STAGES = {
+    "search": "get_arxiv_possibilities",
+    "select": "select_best_arxiv_papers",
+    "download": "download_pdf",
+    "questions": "generate_questions_from_paper",
+    "summary": "generate_summary_from_paper",
+    "edit": "edit_summary",
+    "digest": "generate_fused_digest",
+    "email": "send_email",
+}
+
+
+# Helper function: Build a minimal multi-page PDF that PyPDF2 can extract text from
+def make_pdf(pages):
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>")
+    font_ref = 3 + 2 * len(pages)
+    for i, text in enumerate(pages):
+        lines = "".join(f"({line}) Tj T* " for line in text.replace("(", "").replace(")", "").split("\n"))
+        stream = f"BT /F1 9 Tf 11 TL 40 760 Td {lines}ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_ref} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    return out
+
+
+def make_paper_pdf(paper_id, page_count):
+    sentence = "The agent planner improves success on the benchmark by twelve points over the baseline."
+    pages = []
+    for page in range(page_count):
+        heading = f"{page + 1} Section {page + 1}" if page else f"Paper {paper_id}\nAbstract"
+        pages.append(heading + "\n" + "\n".join(sentence for _ in range(45)))
+    return make_pdf(pages)
+
+
+class FakeRateLimitError(Exception):
+    """Looks like a provider 429 to the scheduler."""
+
+    status_code = 429
+
+
+class FakeLLM:
+    """Stand-in for litellm.acompletion with a latency model and token counters."""
+
+    def __init__(
+        self,
+        base_latency,
+        input_tokens_per_second,
+        output_tokens_per_second,
+        selected_papers,
+        rate_limit_rate=0.0,
+        bad_digest_rate=0.0,
+    ):
+        self.base_latency = base_latency
+        self.input_tokens_per_second = input_tokens_per_second
+        self.output_tokens_per_second = output_tokens_per_second
+        self.selected_papers = selected_papers
+        # Fraction of calls answered with a 429, to exercise the scheduler's backoff
+        self.rate_limit_rate = rate_limit_rate
+        # Fraction of fused digest answers cut short, to exercise the fallback
+        self.bad_digest_rate = bad_digest_rate
+        self.calls = 0
+        self.rate_limited = 0
+        self.seen_prompts = []
+        self.cached_prompt_tokens = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @staticmethod
+    def _article(sentences_per_section):
+        paragraph = " ".join(["The paper introduces an agent that plans, acts and reflects on its results."] * sentences_per_section)
+        return "\n\n".join(f"{header}:\n{paragraph}" for header in ("Overview", "Method", "Results", "Implications"))
+
+    # Provider-style prefix cache: the longest prefix shared with an earlier prompt,
+    # counted from 1024 tokens up in 128-token steps (OpenAI's rules)
+    def _cached_prefix_tokens(self, prompt):
+        shared = max((len(os.path.commonprefix([prompt, seen])) for seen in self.seen_prompts), default=0)
+        tokens = shared // CHARS_PER_TOKEN
+        return 0 if tokens < 1024 else 1024 + (tokens - 1024) // 128 * 128
+
+    def _answer(self, prompt):
+        if "Respond with ONLY the URLs" in prompt:
+            urls = re.findall(r'"url": "([^"]+)"', prompt)
+            return ", ".join(urls[: self.selected_papers])
+        questions = [f"{i}. What does the paper show about point {i}?" for i in range(1, 9)]
+        if "Respond with a single JSON object" in prompt:
+            answer = json.dumps({"questions": questions, "summary": self._article(10), "article": self._article(9)})
+            return answer[: len(answer) // 2] if random.random() < self.bad_digest_rate else answer
+        if "generate a list of major questions" in prompt:
+            return "\n".join(questions)
+        # Drafts run a little long (524 words); the editor brings them inside 300-500
+        return self._article(9 if "article editor" in prompt else 10)
+
+    async def __call__(self, model, messages, max_tokens=1024, **kwargs):
+        if random.random() < self.rate_limit_rate:
+            self.rate_limited += 1
+            await asyncio.sleep(self.base_latency / 10)
+            raise FakeRateLimitError("429 Too Many Requests (injected)")
+        prompt = "\n".join(message["content"] for message in messages)
+        content = self._answer(prompt)
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+        completion_tokens = min(max_tokens, len(content) // CHARS_PER_TOKEN)
+        cached_tokens = self._cached_prefix_tokens(prompt)
+        self.seen_prompts.append(prompt)
+        self.calls += 1
+        self.cached_prompt_tokens += cached_tokens
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        await asyncio.sleep(
+            self.base_latency
+            + prompt_tokens / self.input_tokens_per_second
+            + completion_tokens / self.output_tokens_per_second
+        )
+        return {
+            "model": model,
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+
+
+class PdfServer:
+    """Local HTTP server answering /pdf/<arxiv id> with a generated PDF."""
+
+    def __init__(self):
+        self.page_count = 5
+        self._cache = {}
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                paper_id = self.path.rsplit("/", 1)[-1]
+                body = server.pdf_for(paper_id)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def pdf_for(self, paper_id):
+        key = (paper_id, self.page_count)
+        if key not in self._cache:
+            self._cache[key] = make_paper_pdf(paper_id, self.page_count)
+        return self._cache[key]
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+class SmtpSink:
+    """Minimal SMTP server (no TLS, no auth) that keeps every message it receives."""
+
+    def __init__(self):
+        self.messages = []
+        self.server = None
+        self.port = None
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+            self.port = self.server.sockets[0].getsockname()[1]
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=serve, daemon=True).start()
+        ready.wait()
+
+    async def _handle(self, reader, writer):
+        writer.write(b"220 bench-sink ESMTP\r\n")
+        envelope = {"from": None, "to": [], "data": ""}
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                writer.write(b"250 bench-sink\r\n")
+            elif verb == "MAIL":
+                envelope = {"from": command[10:].strip("<> "), "to": [], "data": ""}
+                writer.write(b"250 OK\r\n")
+            elif verb == "RCPT":
+                envelope["to"].append(command[8:].strip("<> "))
+                writer.write(b"250 OK\r\n")
+            elif verb == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                lines = []
+                while True:
+                    data_line = await reader.readline()
+                    if data_line in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(data_line.decode("utf-8", "replace"))
+                envelope["data"] = "".join(lines)
+                self.messages.append(envelope)
+                writer.write(b"250 OK: queued\r\n")
+            elif verb == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class RssSampler:
+    """Samples resident memory in the background to find the peak.
+
+    PDF parsing runs in PdfExtractor's worker processes, so the combined
+    resident memory of this process's descendants is sampled as well
+    (`peak_children_bytes`, an upper bound: pages a forked worker still shares
+    with the parent count in each); without /proc it falls back to the largest
+    finished child from getrusage(RUSAGE_CHILDREN).
+
+    tracemalloc is not used because forked PDF extraction workers inherit it and
+    slow down by two orders of magnitude, which would distort the stage timings.
+    """
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak_bytes = 0
+        self.peak_children_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def rss_bytes(pid="self"):
+        with open(f"/proc/{pid}/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    @staticmethod
+    def current_rss_bytes():
+        try:
+            return RssSampler.rss_bytes()
+        except OSError:
+            # No /proc (macOS): fall back to the lifetime peak, reported in bytes there
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    @staticmethod
+    def descendant_pids(pid="self"):
+        """Children, grandchildren, ... (a forkserver parents the pool workers itself)."""
+        pids = []
+        try:
+            for task in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{task}/children", "r") as file:
+                    pids.extend(int(child) for child in file.read().split())
+        except OSError:
+            return pids
+        for child in list(pids):
+            pids.extend(RssSampler.descendant_pids(child))
+        return pids
+
+    @staticmethod
+    def children_rss_bytes():
+        if not os.path.exists("/proc/self/task"):
+            # ru_maxrss of waited-for children; bytes on macOS
+            return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        total = 0
+        for pid in RssSampler.descendant_pids():
+            try:
+                total += RssSampler.rss_bytes(pid)
+            except OSError:
+                pass  # exited between listing and reading
+        return total
+
+    def _sample(self):
+        self.peak_bytes = max(self.peak_bytes, self.current_rss_bytes())
+        self.peak_children_bytes = max(self.peak_children_bytes, self.children_rss_bytes())
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def make_fake_search(pdf_server, papers_per_topic, topics):
+    """Fake search_arxiv_topic: N papers per topic, with 20% shared between neighbouring topics."""
+    stride = max(1, int(papers_per_topic * 0.8))
+    published = datetime.now(timezone.utc)
+
+    def fake_search_arxiv_topic(topic, max_results, stop_event=None, since=None):
+        topic_number = topics.index(topic)
+        # A generator like the real one, so early stopping behaves the same
+        for i in range(min(max_results, papers_per_topic)):
+            if stop_event is not None and stop_event.is_set():
+                return
+            number = topic_number * stride + i
+            yield {
+                "title": f"Synthetic agent paper {number}",
+                "summary": f"An agentic workflow study number {number} with planning and tool use.",
+                "url": f"{pdf_server.base_url}/abs/2501.{number:05d}v1",
+                "published": (published - timedelta(minutes=number)).isoformat(),
+            }
+
+    return fake_search_arxiv_topic
+
+
+def instrument(stage_stats, stage, fn):
+    """Wrap a news_agent function so its calls add to stage_stats[stage]."""
+    stats = stage_stats.setdefault(stage, {"calls": 0, "seconds": 0.0})
+
+    if asyncio.iscoroutinefunction(fn):
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                stats["calls"] += 1
+                stats["seconds"] += time.perf_counter() - started
+
+        return async_wrapper
+
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats["calls"] += 1
+            stats["seconds"] += time.perf_counter() - started
+
+    return wrapper
+
+
+def run_scenario(args, pdf_server, smtp_sink, topic_count, papers_per_topic, page_count):
+    topics = [f"benchmark topic {i}" for i in range(topic_count)]
+    pdf_server.page_count = page_count
+    llm = FakeLLM(
+        args.llm_latency, args.input_tps, args.output_tps, args.selected, args.rate_limit_rate, args.bad_digest_rate
+    )
+    stage_stats = {}
+    messages_before = len(smtp_sink.messages)
+
+    # Swap in the stand-ins, remembering the originals so every scenario starts clean
+    originals = {name: getattr(news_agent, name) for name in list(STAGES.values()) + ["search_arxiv_topic"]}
+    original_extract = news_agent.PdfExtractor.extract
+    original_acompletion = news_agent.acompletion
+    original_digest_mode = news_agent.DIGEST_MODE
+    work_dir = tempfile.mkdtemp(prefix="news_agent_bench_")
+    cwd = os.getcwd()
+    try:
+        news_agent.acompletion = llm
+        news_agent.DIGEST_MODE = args.digest_mode
+        news_agent.search_arxiv_topic = make_fake_search(pdf_server, papers_per_topic, topics)
+        for stage, name in STAGES.items():
+            setattr(news_agent, name, instrument(stage_stats, stage, originals[name]))
+        news_agent.PdfExtractor.extract = instrument(stage_stats, "extract", original_extract)
+        os.chdir(work_dir)
+
+        # Several readers with the same interests must cost about as much as one
+        profiles = None
+        if args.readers > 1:
+            profiles = [
+                make_profile(f"reader{i}", topics, news_agent.DEFAULT_SELECT_PROMPT_FILE, [f"reader{i}@example.com"], papers_per_topic)
+                for i in range(args.readers)
+            ]
+
+        with RssSampler() as memory:
+            started = time.perf_counter()
+            asyncio.run(
+                news_agent.main(
+                    topics=topics,
+                    max_results=papers_per_topic,
+                    recipients=["reader@example.com"],
+                    max_concurrent_papers=args.concurrency,
+                    profiles=profiles,
+                )
+            )
+            wall_seconds = time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+        for name, fn in originals.items():
+            setattr(news_agent, name, fn)
+        news_agent.PdfExtractor.extract = original_extract
+        news_agent.acompletion = original_acompletion
+        news_agent.DIGEST_MODE = original_digest_mode
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    articles_checked, articles_passing = check_articles(smtp_sink.messages[messages_before:])
+    return {
+        "topics": topic_count,
+        "papers_per_topic": papers_per_topic,
+        "pages": page_count,
+        "digest_mode": args.digest_mode,
+        "readers": args.readers,
+        "wall_seconds": round(wall_seconds, 3),
+        "stages": {stage: {"calls": s["calls"], "seconds": round(s["seconds"], 3)} for stage, s in stage_stats.items()},
+        "llm_calls": llm.calls,
+        "llm_rate_limited": llm.rate_limited,
+        "prompt_tokens": llm.prompt_tokens,
+        "cached_prompt_tokens": llm.cached_prompt_tokens,
+        "completion_tokens": llm.completion_tokens,
+        "peak_rss_mb": round(memory.peak_bytes / 1e6, 1),
+        # PDF extraction workers, where memory grows with the page count
+        "peak_children_rss_mb": round(memory.peak_children_bytes / 1e6, 1),
+        "emails_delivered": len(smtp_sink.messages) - messages_before,
+        # Quality proxy for comparing digest modes: emailed articles that meet the editor rules
+        "articles": articles_checked,
+        "articles_passing_editor_rules": articles_passing,
+        # news_agent's own per-stage metrics (tokens from the usage field, cost, retries, cache hits)
+        "run_metrics": news_agent.run_metrics.report(),
+    }
+
+
+# Helper function: Check every article in the delivered digests against the editor rules
+def check_articles(messages):
+    checked = passing = 0
+    for message in messages:
+        body = email.message_from_string(message["data"]).get_payload(0).get_payload(decode=True).decode()
+        body = body.replace("\r\n", "\n")
+        for section in body.split("=== Paper: ")[1:]:
+            # Drop the title and URL lines, and the process-log link after the last article
+            article = section.split("\n\n", 1)[-1].split("\n\nView the process log:")[0]
+            checked += 1
+            passing += not check_editor_rules(article)
+    return checked, passing
+
+
+# Compare wall time and prompt tokens against a previous results file
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, "r") as file:
+        baseline = {
+            (r["topics"], r["papers_per_topic"], r["pages"], r.get("digest_mode", "staged"), r.get("readers", 1)): r
+            for r in json.load(file)["scenarios"]
+        }
+    regressions = 0
+    for result in results:
+        previous = baseline.get(
+            (result["topics"], result["papers_per_topic"], result["pages"], result["digest_mode"], result["readers"])
+        )
+        if previous is None:
+            continue
+        for metric in ("wall_seconds", "prompt_tokens"):
+            before, after = previous[metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            flag = "REGRESSION" if change > threshold else ""
+            regressions += bool(flag)
+            print(
+                f"  topics={result['topics']} papers={result['papers_per_topic']} pages={result['pages']} "
+                f"{metric}: {before} -> {after} ({change:+.1%}) {flag}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of news_agent.main()")
+    parser.add_argument("--topics", type=int, nargs="+", default=[1, 2], help="Topic counts to run")
+    parser.add_argument("--papers", type=int, nargs="+", default=[20, 100], help="Papers per topic")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20], help="Pages per PDF")
+    parser.add_argument("--selected", type=int, default=5, help="Papers the fake selector picks")
+    parser.add_argument("--concurrency", type=int, default=news_agent.MAX_CONCURRENT_PAPERS)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fixed seconds per fake LLM call")
+    parser.add_argument("--input-tps", type=float, default=50000, help="Fake prompt tokens processed per second")
+    parser.add_argument("--output-tps", type=float, default=2000, help="Fake completion tokens generated per second")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of fake LLM calls that return a 429")
+    parser.add_argument("--readers", type=int, default=1, help="Reader profiles sharing the same topics")
+    parser.add_argument("--digest-mode", choices=("staged", "fused"), default=news_agent.DIGEST_MODE)
+    parser.add_argument("--bad-digest-rate", type=float, default=0.0, help="Fraction of fused answers returned as broken JSON")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative increase reported as a regression")
+    args = parser.parse_args()
+
+    pdf_server = PdfServer()
+    smtp_sink = SmtpSink()
+    news_agent.SMTP_HOST, news_agent.SMTP_PORT = "127.0.0.1", smtp_sink.port
+    # The local sink speaks plain SMTP
+    news_agent.SMTP_REQUIRE_TLS = False
+    os.environ.setdefault("EMAIL", "news-agent@example.com")
+
+    results = []
+    try:
+        for topic_count in args.topics:
+            for papers_per_topic in args.papers:
+                for page_count in args.pages:
+                    result = run_scenario(args, pdf_server, smtp_sink, topic_count, papers_per_topic, page_count)
+                    results.append(result)
+    finally:
+        if news_agent.mailer is not None:
+            news_agent.mailer.close_blocking()
+        pdf_server.close()
+        smtp_sink.close()
+
+    print(f"\n{'topics':>6} {'papers':>6} {'pages':>5} {'wall_s':>7} {'calls':>5} {'prompt_tok':>10} {'cached':>7} {'rss_mb':>7} {'kids_mb':>7} {'ok/art':>6}  stages")
+    for r in results:
+        stages = " ".join(f"{stage}={s['seconds']}" for stage, s in r["stages"].items())
+        print(
+            f"{r['topics']:>6} {r['papers_per_topic']:>6} {r['pages']:>5} {r['wall_seconds']:>7} "
+            f"{r['llm_calls']:>5} {r['prompt_tokens']:>10} {r['cached_prompt_tokens']:>7} {r['peak_rss_mb']:>7} {r['peak_children_rss_mb']:>7} "
+            f"{str(r['articles_passing_editor_rules']) + '/' + str(r['articles']):>6}  {stages}"
+        )
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "scenarios": results,
+    }
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Wrote {args.json}")
+    if args.compare:
+        print(f"\nComparison with {args.compare}:")
+        regressions = compare(results, args.compare, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Benchmark: import time and cold start of news_agent.py
+# Spawns fresh interpreters so every measurement is a cold start, and checks
+# the results against targets. Exits non-zero when a target is missed.
+#
+# Usage: python bench_startup.py [--runs 10] [--json startup.json]
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(AGENT_DIR, "news_agent.py")
+
+# `news_agent.py --help` must not pay for litellm, weave, wandb or PyPDF2
+HELP_TARGET_SECONDS = 0.3
+IMPORT_TARGET_SECONDS = 0.15
+HEAVY_MODULES = ("litellm", "weave", "wandb", "PyPDF2", "arxiv", "httpx", "numpy")
+
+
+def time_command(args, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(args, cwd=AGENT_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+# Parse `python -X importtime` output into (module, cumulative seconds), slowest first
+def import_breakdown():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import news_agent"],
+        cwd=AGENT_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            rows.append((match.group(4), int(match.group(2)) / 1e6))
+    return sorted(rows, key=lambda row: -row[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure news_agent.py import time and cold start")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+    import_times = time_command([sys.executable, "-c", "import news_agent"], args.runs)
+    help_times = time_command([sys.executable, SCRIPT, "--help"], args.runs)
+    breakdown = import_breakdown()
+    heavy_loaded = sorted({name.split(".")[0] for name, _ in breakdown} & set(HEAVY_MODULES))
+
+    interpreter = statistics.median(baseline)
+    results = {
+        "interpreter_seconds": round(interpreter, 4),
+        "import_seconds": round(statistics.median(import_times) - interpreter, 4),
+        "help_seconds": round(statistics.median(help_times), 4),
+        "import_target_seconds": IMPORT_TARGET_SECONDS,
+        "help_target_seconds": HELP_TARGET_SECONDS,
+        "heavy_modules_loaded_on_import": heavy_loaded,
+        "slowest_imports": [{"module": name, "seconds": round(seconds, 4)} for name, seconds in breakdown[:10]],
+    }
+
+    print(f"Bare interpreter:        {results['interpreter_seconds']:.3f}s")
+    print(f"import news_agent:       {results['import_seconds']:.3f}s (target {IMPORT_TARGET_SECONDS}s)")
+    print(f"news_agent.py --help:    {results['help_seconds']:.3f}s (target {HELP_TARGET_SECONDS}s)")
+    print(f"Heavy modules on import: {', '.join(heavy_loaded) or 'none'}")
+    print("Slowest imports:")
+    for row in results["slowest_imports"]:
+        print(f"  {row['module']:<30} {row['seconds']:.4f}s")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Wrote {args.json}")
+
+    passed = (
+        results["import_seconds"] <= IMPORT_TARGET_SECONDS
+        and results["help_seconds"] <= HELP_TARGET_SECONDS
+        and not heavy_loaded
+    )
+    print("PASS" if passed else "FAIL")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
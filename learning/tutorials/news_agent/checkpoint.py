@@ -0,0 +1,88 @@
+# Checkpointed, resumable pipeline runs
+# Every completed step of a run is written atomically to its own JSON file
+# under runs/<run-id>/, so `--resume <run-id>` can pick up from the last
+# completed step instead of repeating search, selection and LLM calls.
+#
+#   runs/<run-id>/search.json          (papers plus the watermarks to commit after delivery)
+#   runs/<run-id>/selection.json
+#   runs/<run-id>/papers/<paper-key>/{download,extraction,questions,summary,edit}.json
+#   runs/<run-id>/email.json
+
+import json
+import os
+import re
+from datetime import datetime
+
+DEFAULT_RUNS_DIR = "runs"
+PAPER_STAGES = ("download", "extraction", "questions", "summary", "edit")
+
+
+# Helper function: Write JSON so readers only ever see the old or the new file
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class RunCheckpoint:
+    def __init__(self, run_id, runs_dir=DEFAULT_RUNS_DIR):
+        self.run_id = run_id
+        self.run_dir = os.path.join(runs_dir, run_id)
+        os.makedirs(self.run_dir, exist_ok=True)
+
+    @classmethod
+    def create(cls, runs_dir=DEFAULT_RUNS_DIR):
+        """Start a new run in a directory of its own; runs started in the same second get -2, -3, ..."""
+        os.makedirs(runs_dir, exist_ok=True)
+        base_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = 1
+        while True:
+            run_id = base_id if suffix == 1 else f"{base_id}-{suffix}"
+            try:
+                # mkdir fails if the directory exists, so two processes never share a run
+                os.mkdir(os.path.join(runs_dir, run_id))
+                return cls(run_id, runs_dir)
+            except FileExistsError:
+                suffix += 1
+
+    @classmethod
+    def resume(cls, run_id, runs_dir=DEFAULT_RUNS_DIR):
+        if not os.path.isdir(os.path.join(runs_dir, run_id)):
+            raise FileNotFoundError(f"No checkpointed run {run_id!r} in {runs_dir}/")
+        return cls(run_id, runs_dir)
+
+    def _stage_path(self, stage, paper_key=None):
+        if paper_key is None:
+            return os.path.join(self.run_dir, f"{stage}.json")
+        paper_dir = os.path.join(self.run_dir, "papers", re.sub(r"[^A-Za-z0-9._-]", "_", paper_key))
+        os.makedirs(paper_dir, exist_ok=True)
+        return os.path.join(paper_dir, f"{stage}.json")
+
+    def load(self, stage, paper_key=None):
+        """Return the saved result of a completed step, or None if it has not completed."""
+        try:
+            with open(self._stage_path(stage, paper_key), "r", encoding="utf-8") as file:
+                return json.load(file)["result"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, stage, result, paper_key=None):
+        write_json_atomic(
+            self._stage_path(stage, paper_key),
+            {"stage": stage, "completed_at": datetime.now().isoformat(), "result": result},
+        )
+        return result
+
+    def completed_stages(self):
+        """Summary of which steps finished, for printing on resume."""
+        stages = sorted(name[:-5] for name in os.listdir(self.run_dir) if name.endswith(".json"))
+        papers_dir = os.path.join(self.run_dir, "papers")
+        papers = {}
+        if os.path.isdir(papers_dir):
+            for paper_key in sorted(os.listdir(papers_dir)):
+                done = {name[:-5] for name in os.listdir(os.path.join(papers_dir, paper_key)) if name.endswith(".json")}
+                papers[paper_key] = [stage for stage in PAPER_STAGES if stage in done]
+        return {"stages": stages, "papers": papers}
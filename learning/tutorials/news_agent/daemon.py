@@ -0,0 +1,297 @@
+# Long-running daemon mode for the news agent
+# Stays resident so that interpreter startup, heavy imports, the W&B login,
+# Weave init and the HTTP, SMTP and PDF-worker pools are paid for once. Runs
+# digests on an internal cron schedule, never two at a time, and accepts
+# on-demand commands over a local Unix socket. On SIGTERM/SIGINT it stops
+# taking new runs and lets the run in flight finish (a second signal, or the
+# shutdown timeout, cancels it; its checkpoint can be resumed with --resume).
+#
+# Usage: python daemon.py [--schedule "0 7 * * 1-5"] [news_agent.py options]
+#        python daemon.py --send run|status|stop
+
+import argparse
+import asyncio
+import fcntl
+import json
+import os
+import signal
+import time
+from datetime import datetime, timedelta
+
+import news_agent
+from downloader import create_http_client
+from pdf_extract import PdfExtractor
+
+DEFAULT_SCHEDULE = "0 7 * * *"
+DEFAULT_SOCKET = "news_agent.sock"
+LOCK_FILE = "news_agent.daemon.lock"
+DEFAULT_SHUTDOWN_TIMEOUT = 600.0
+
+# (low, high) for minute, hour, day of month, month, day of week (0 = Sunday)
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+# Helper function: Parse one cron field ("*", "5", "1-5", "*/15", "1,15") into a set of values
+def parse_cron_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        # Day of week 7 is Sunday too
+        if high == 6 and end == 7:
+            values.add(0)
+            end = 6
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"cron field {text!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A five-field cron expression (minute hour day-of-month month day-of-week), in local time."""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"expected 5 cron fields, got {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)
+        )
+        # As in cron, a restricted day of month and day of week match if either does
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment):
+        """The first matching minute strictly after `moment`."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Jump a month, day or hour at a time instead of testing every minute
+        for _ in range(100_000):
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"cron expression {self.expression!r} never matches")
+
+
+class NewsAgentDaemon:
+    def __init__(self, schedule, run_kwargs, socket_path=DEFAULT_SOCKET, shutdown_timeout=DEFAULT_SHUTDOWN_TIMEOUT):
+        self.schedule = schedule
+        self.run_kwargs = run_kwargs
+        self.socket_path = socket_path
+        self.shutdown_timeout = shutdown_timeout
+        self.run_task = None
+        self.next_run = None
+        self.last_run = None
+        self.runs_started = 0
+        self.stopping = None
+        self.http_client = None
+        self.pdf_extractor = None
+
+    def status(self):
+        return {
+            "running": self.run_task is not None and not self.run_task.done(),
+            "stopping": self.stopping.is_set(),
+            "schedule": self.schedule.expression,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "last_run": self.last_run,
+            "runs_started": self.runs_started,
+        }
+
+    def trigger(self, reason):
+        """Start a run unless one is in flight or the daemon is stopping; returns whether it started."""
+        if self.stopping.is_set():
+            print(f"Ignoring {reason} trigger: shutting down")
+            return False
+        if self.run_task is not None and not self.run_task.done():
+            print(f"Skipping {reason} run: the previous run is still in progress")
+            return False
+        self.runs_started += 1
+        self.run_task = asyncio.create_task(self._run(reason))
+        return True
+
+    async def _run(self, reason):
+        started = time.time()
+        print(f"\n=== {reason} run started at {datetime.now().isoformat(timespec='seconds')} ===")
+        status = "ok"
+        try:
+            await news_agent.main(**self.run_kwargs, http_client=self.http_client, pdf_extractor=self.pdf_extractor)
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            # A failed run must not take the daemon down; the next trigger tries again
+            status = f"failed: {e}"
+            print(f"Run failed: {e}")
+        finally:
+            self.last_run = {
+                "reason": reason,
+                "started_at": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+                "seconds": round(time.time() - started, 1),
+                "status": status,
+            }
+            print(f"=== {reason} run finished: {status} ===")
+
+    async def _handle_client(self, reader, writer):
+        try:
+            command = (await reader.readline()).decode().strip().lower()
+            if command == "run":
+                reply = {"started": self.trigger("on-demand"), **self.status()}
+            elif command == "status":
+                reply = self.status()
+            elif command == "stop":
+                self.request_stop()
+                reply = {"stopping": True}
+            else:
+                reply = {"error": f"unknown command {command!r}; use run, status or stop"}
+            writer.write((json.dumps(reply) + "\n").encode())
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def request_stop(self):
+        if self.stopping.is_set():
+            # Second request: do not wait for the run in flight
+            if self.run_task is not None and not self.run_task.done():
+                print("Cancelling the run in flight")
+                self.run_task.cancel()
+            return
+        print("Shutting down: no new runs; waiting for the run in flight to finish")
+        self.stopping.set()
+
+    async def _wait_for_next_tick(self):
+        self.next_run = self.schedule.next_after(datetime.now())
+        print(f"Next scheduled run: {self.next_run.isoformat(timespec='minutes')}")
+        # Sleep in short steps so clock changes and suspends do not delay the run
+        while not self.stopping.is_set():
+            remaining = (self.next_run - datetime.now()).total_seconds()
+            if remaining <= 0:
+                return True
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=min(remaining, 60))
+            except asyncio.TimeoutError:
+                pass
+        return False
+
+    async def serve(self, run_now=False):
+        self.stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.request_stop)
+
+        max_concurrency = max(1, self.run_kwargs.get("max_concurrent_papers") or news_agent.MAX_CONCURRENT_PAPERS)
+        # Warm everything every run would otherwise rebuild
+        news_agent.get_acompletion()
+        self.pdf_extractor = PdfExtractor(max_workers=max_concurrency)
+        server = None
+        async with create_http_client(max_connections=max_concurrency) as self.http_client:
+            try:
+                if os.path.exists(self.socket_path):
+                    os.remove(self.socket_path)
+                server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+                os.chmod(self.socket_path, 0o600)
+                print(f"news_agent daemon listening on {self.socket_path}, schedule {self.schedule.expression!r}")
+
+                if run_now:
+                    self.trigger("startup")
+                while await self._wait_for_next_tick():
+                    self.trigger("scheduled")
+
+                if self.run_task is not None and not self.run_task.done():
+                    try:
+                        await asyncio.wait_for(asyncio.shield(self.run_task), timeout=self.shutdown_timeout)
+                    except asyncio.TimeoutError:
+                        print(f"The run did not finish within {self.shutdown_timeout}s, cancelling it")
+                        self.run_task.cancel()
+                    except asyncio.CancelledError:
+                        pass
+                    # Wait for the cancellation, if any, to unwind
+                    await asyncio.gather(self.run_task, return_exceptions=True)
+            finally:
+                if server is not None:
+                    server.close()
+                    await server.wait_closed()
+                if os.path.exists(self.socket_path):
+                    os.remove(self.socket_path)
+                self.pdf_extractor.close()
+                if news_agent.mailer is not None:
+                    await news_agent.mailer.close()
+        print("news_agent daemon stopped")
+
+
+# Helper function: Send one command to a running daemon and return its JSON reply
+def send_command(socket_path, command):
+    async def exchange():
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(f"{command}\n".encode())
+        await writer.drain()
+        reply = await reader.readline()
+        writer.close()
+        return json.loads(reply)
+
+    return asyncio.run(exchange())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run news_agent as a resident daemon; other options are passed to news_agent.py"
+    )
+    parser.add_argument("--schedule", default=DEFAULT_SCHEDULE, help="Cron expression in local time (default: daily at 07:00)")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket for run/status/stop commands")
+    parser.add_argument("--shutdown-timeout", type=float, default=DEFAULT_SHUTDOWN_TIMEOUT, help="Seconds to let a run finish on shutdown")
+    parser.add_argument("--run-now", action="store_true", help="Start a run immediately as well")
+    parser.add_argument("--send", choices=("run", "status", "stop"), help="Send a command to a running daemon and exit")
+    args, agent_argv = parser.parse_known_args(argv)
+
+    if args.send:
+        try:
+            print(json.dumps(send_command(args.socket, args.send), indent=2))
+        except OSError as e:
+            raise SystemExit(f"No daemon answering on {args.socket}: {e}")
+        return
+
+    try:
+        schedule = CronSchedule(args.schedule)
+    except ValueError as e:
+        raise SystemExit(f"Invalid --schedule: {e}")
+    agent_args = news_agent.parse_args(agent_argv)
+    run_kwargs = news_agent.main_kwargs(agent_args)
+    # Every daemon run starts fresh; interrupted runs are resumed with news_agent.py --resume
+    run_kwargs["resume_run_id"] = None
+
+    # One daemon per working directory: the runs share its ledger, stores and runs/ folder
+    lock_file = open(LOCK_FILE, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise SystemExit(f"Another news_agent daemon holds {LOCK_FILE}")
+
+    news_agent.init_environment(agent_args)
+    asyncio.run(NewsAgentDaemon(schedule, run_kwargs, args.socket, args.shutdown_timeout).serve(run_now=args.run_now))
+
+
+# The guard matters: PDF extraction workers re-import modules when processes are spawned
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# Async PDF downloader for the news agent
+# Replaces the old `os.system("curl ...")` call with a shared keep-alive
+# connection pool, streamed writes, retries and a size cap.
+
+import asyncio
+import os
+import random
+
+# Largest PDF we are willing to download (arXiv papers are rarely above 20 MB)
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+PDF_MAGIC = b"%PDF-"
+PDF_EOF_MARKER = b"%%EOF"
+
+
+class DownloadError(Exception):
+    """A download failed and should not be retried (or ran out of retries)."""
+
+
+class _RetryableDownloadError(Exception):
+    """Internal marker for failures that are worth another attempt."""
+
+
+# Helper function: Check that a file looks like a complete PDF
+def is_valid_pdf(path):
+    try:
+        size = os.path.getsize(path)
+        if size < len(PDF_MAGIC):
+            return False
+        with open(path, "rb") as file:
+            if file.read(len(PDF_MAGIC)) != PDF_MAGIC:
+                return False
+            # The %%EOF marker sits in the last few bytes of a finished PDF
+            file.seek(max(0, size - 1024))
+            return PDF_EOF_MARKER in file.read()
+    except OSError:
+        return False
+
+
+# Helper function: Create the shared HTTP client (one connection pool per run)
+def create_http_client(max_connections=8, timeout=60.0):
+    # Imported here so that importing news_agent stays cheap
+    import httpx
+
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=httpx.Timeout(timeout, connect=10.0),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        headers={"User-Agent": "news_agent/1.0 (+https://arxiv.org/help/api)"},
+    )
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def _stream_to_file(client, url, tmp_path, max_bytes):
+    async with client.stream("GET", url) as response:
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableDownloadError(f"HTTP {response.status_code} for {url}")
+        if response.status_code >= 400:
+            raise DownloadError(f"HTTP {response.status_code} for {url}")
+
+        content_length = response.headers.get("content-length")
+        if content_length and int(content_length) > max_bytes:
+            raise DownloadError(f"{url} is {content_length} bytes, above the {max_bytes} byte limit")
+
+        size = 0
+        with open(tmp_path, "wb") as file:
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DownloadError(f"{url} exceeded the {max_bytes} byte limit")
+                file.write(chunk)
+
+    # arXiv sometimes answers with an HTML page while the PDF is being built
+    if not is_valid_pdf(tmp_path):
+        raise _RetryableDownloadError(f"{url} did not return a complete PDF")
+
+
+# Download a single PDF, skipping it if a valid copy is already on disk
+async def download_pdf(client, url, dest_path, max_bytes=DEFAULT_MAX_BYTES, retries=3, backoff=1.0, on_retry=None):
+    """Download `url` to `dest_path`; `on_retry`, if given, is called before each retry."""
+    import httpx
+
+    if is_valid_pdf(dest_path):
+        print(f"Already downloaded {dest_path}, skipping")
+        return dest_path
+
+    tmp_path = dest_path + ".part"
+    for attempt in range(retries + 1):
+        try:
+            await _stream_to_file(client, url, tmp_path, max_bytes)
+            os.replace(tmp_path, dest_path)
+            print(f"Downloaded {url} -> {dest_path}")
+            return dest_path
+        except DownloadError:
+            _remove_quietly(tmp_path)
+            raise
+        except (_RetryableDownloadError, httpx.TransportError) as e:
+            _remove_quietly(tmp_path)
+            if attempt == retries:
+                raise DownloadError(f"Giving up on {url} after {retries + 1} attempts: {e}") from e
+            delay = backoff * (2 ** attempt) + random.uniform(0, backoff)
+            print(f"Download of {url} failed ({e}), retrying in {delay:.1f}s")
+            if on_retry is not None:
+                on_retry()
+            await asyncio.sleep(delay)
+
@@ -0,0 +1,55 @@
+# Local check of the editor prompt's rules (editor_prompt.txt)
+# The editor call only enforces mechanical rules: 300-500 words, every
+# section under an unstyled header that ends with a colon, and no bullets or
+# lists. When a summary already meets them, the edit call can be skipped.
+
+import re
+
+DEFAULT_MIN_WORDS = 300
+DEFAULT_MAX_WORDS = 500
+# Longer lines are body text, not headers
+MAX_HEADER_WORDS = 12
+
+BULLET_LINE = re.compile(r"^\s*(?:[-*•+]|\d+[.)]|[a-zA-Z][.)])\s+")
+STYLED_LINE = re.compile(r"^\s*(?:#+\s|\*\*|__)")
+SENTENCE_END = (".", "!", "?", '"', "'", ")")
+
+
+def is_header(line):
+    line = line.strip()
+    return line.endswith(":") and 0 < len(line.split()) <= MAX_HEADER_WORDS
+
+
+# Helper function: A short line with no closing punctuation reads as a header missing its colon
+def looks_like_header(line):
+    line = line.strip()
+    return 0 < len(line.split()) <= MAX_HEADER_WORDS and not line.endswith(SENTENCE_END + (":",))
+
+
+def check_editor_rules(text, min_words=DEFAULT_MIN_WORDS, max_words=DEFAULT_MAX_WORDS):
+    """Return the editor rules `text` breaks, as readable strings (empty when it passes)."""
+    problems = []
+    lines = [line for line in text.strip().splitlines() if line.strip()]
+    if not lines:
+        return ["article is empty"]
+
+    word_count = len(text.split())
+    if not min_words <= word_count <= max_words:
+        problems.append(f"{word_count} words, outside {min_words}-{max_words}")
+
+    if any(BULLET_LINE.match(line) for line in lines):
+        problems.append("contains bullets or a list")
+    if any(STYLED_LINE.match(line) for line in lines):
+        problems.append("contains styled (markdown) headers")
+
+    headers = [line for line in lines if is_header(line)]
+    if not headers:
+        problems.append("no section headers")
+    elif not is_header(lines[0]):
+        problems.append("does not start with a section header")
+    if any(looks_like_header(line) and not BULLET_LINE.match(line) for line in lines):
+        problems.append("a header does not end with a colon")
+    # Two headers in a row means a section with no body
+    if any(is_header(a) and is_header(b) for a, b in zip(lines, lines[1:])):
+        problems.append("empty section")
+    return problems
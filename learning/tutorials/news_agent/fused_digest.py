@@ -0,0 +1,75 @@
+# Fused single-call paper digest
+# Instead of three round-trips (questions, summary, edit), one call returns
+# the questions, the draft summary and the edited article together as JSON.
+# The paper text is sent once instead of twice. The three original prompt
+# files still drive the content; this module only combines them and checks
+# the answer against a small schema.
+
+import json
+import re
+
+from prompts import paper_context
+
+# Required keys and their types in the model's JSON answer
+DIGEST_SCHEMA = {"questions": list, "summary": str, "article": str}
+
+FUSED_INSTRUCTIONS = """Work through the three tasks below in order, in a single answer.
+
+Task 1 - Questions:
+{question_prompt}
+
+Task 2 - Summary (answer the questions from Task 1):
+{summary_prompt}
+
+Task 3 - Editing (apply this to the summary from Task 2):
+{editor_prompt}
+
+Respond with a single JSON object and nothing else, with exactly these keys:
+  "questions": a list of strings, one question each
+  "summary": the summary from Task 2, as a string
+  "article": the edited article from Task 3, as a string (use \\n for line breaks)"""
+
+CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+class DigestFormatError(ValueError):
+    """The model's answer is not a JSON object matching DIGEST_SCHEMA."""
+
+
+def build_digest_prompt(question_prompt, summary_prompt, editor_prompt, paper_text, reference_text=""):
+    prompt = FUSED_INSTRUCTIONS.format(
+        question_prompt=question_prompt.strip(),
+        summary_prompt=summary_prompt.strip(),
+        editor_prompt=editor_prompt.strip(),
+    )
+    if reference_text:
+        prompt += f"\n\nPREVIOUS Reference Article:\n{reference_text}"
+    # Same prefix as the three-stage prompts, so a fallback gets the paper from the provider cache
+    return f"{paper_context(paper_text)}\n\nTask:\n{prompt}"
+
+
+def parse_digest(text):
+    """Parse and validate the fused answer; raises DigestFormatError."""
+    try:
+        digest = json.loads(CODE_FENCE.sub("", text.strip()))
+    except json.JSONDecodeError as e:
+        raise DigestFormatError(f"not valid JSON: {e}") from e
+    if not isinstance(digest, dict):
+        raise DigestFormatError(f"expected a JSON object, got {type(digest).__name__}")
+
+    for key, expected_type in DIGEST_SCHEMA.items():
+        value = digest.get(key)
+        # A single block of questions is accepted and split into lines
+        if key == "questions" and isinstance(value, str):
+            value = [line for line in value.splitlines() if line.strip()]
+        if not isinstance(value, expected_type) or not value:
+            raise DigestFormatError(f'"{key}" is missing, empty or not a {expected_type.__name__}')
+        digest[key] = value
+    if not all(isinstance(question, str) and question.strip() for question in digest["questions"]):
+        raise DigestFormatError('"questions" must be a list of non-empty strings')
+    return {key: digest[key] for key in DIGEST_SCHEMA}
+
+
+# Helper function: The questions in the plain-text form the three-stage path produces
+def format_questions(questions):
+    return "\n".join(questions)
@@ -0,0 +1,138 @@
+# Seen-paper ledger for the news agent
+# Records every paper the agent selected, summarized and emailed, keyed by
+# arXiv id and version, so already-digested papers are filtered out before
+# selection and a stored summary is reused when a paper comes back.
+# With reader profiles, deliveries are also recorded per profile, so a paper
+# sent to one reader can still be selected for another.
+
+import sqlite3
+import time
+
+DEFAULT_LEDGER_FILE = "paper_ledger.sqlite3"
+DEFAULT_RETENTION_DAYS = 180
+
+STATUS_SELECTED = "selected"
+STATUS_SUMMARIZED = "summarized"
+STATUS_EMAILED = "emailed"
+
+
+class PaperLedger:
+    def __init__(self, path=DEFAULT_LEDGER_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS papers (
+                arxiv_id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                title TEXT,
+                status TEXT NOT NULL,
+                summary TEXT,
+                selected_at REAL,
+                summarized_at REAL,
+                emailed_at REAL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (arxiv_id, version)
+            );
+            CREATE INDEX IF NOT EXISTS papers_status ON papers (status, updated_at);
+            CREATE TABLE IF NOT EXISTS deliveries (
+                arxiv_id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                emailed_at REAL NOT NULL,
+                PRIMARY KEY (profile, arxiv_id, version)
+            );
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def mark_selected(self, arxiv_id, version, title):
+        now = time.time()
+        # Never downgrade a paper that is already summarized or emailed
+        self.conn.execute(
+            """
+            INSERT INTO papers (arxiv_id, version, title, status, selected_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (arxiv_id, version) DO UPDATE SET selected_at = excluded.selected_at,
+                updated_at = excluded.updated_at
+            """,
+            (arxiv_id, version, title, STATUS_SELECTED, now, now),
+        )
+        self.conn.commit()
+
+    def save_summary(self, arxiv_id, version, title, summary):
+        now = time.time()
+        self.conn.execute(
+            """
+            INSERT INTO papers (arxiv_id, version, title, status, summary, summarized_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (arxiv_id, version) DO UPDATE SET summary = excluded.summary,
+                summarized_at = excluded.summarized_at, updated_at = excluded.updated_at,
+                status = CASE WHEN status = ? THEN status ELSE excluded.status END
+            """,
+            (arxiv_id, version, title, STATUS_SUMMARIZED, summary, now, now, STATUS_EMAILED),
+        )
+        self.conn.commit()
+
+    def mark_emailed(self, papers, profile=None):
+        """Mark (arxiv_id, version) pairs as delivered, to `profile` if given."""
+        now = time.time()
+        self.conn.executemany(
+            "UPDATE papers SET status = ?, emailed_at = ?, updated_at = ? WHERE arxiv_id = ? AND version = ?",
+            [(STATUS_EMAILED, now, now, arxiv_id, version) for arxiv_id, version in papers],
+        )
+        if profile is not None:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO deliveries (arxiv_id, version, profile, emailed_at) VALUES (?, ?, ?, ?)",
+                [(arxiv_id, version, profile, now) for arxiv_id, version in papers],
+            )
+        self.conn.commit()
+
+    def get_summary(self, arxiv_id, version):
+        row = self.conn.execute(
+            "SELECT summary FROM papers WHERE arxiv_id = ? AND version = ? AND summary IS NOT NULL",
+            (arxiv_id, version),
+        ).fetchone()
+        return row[0] if row else None
+
+    def emailed_ids(self, profile=None):
+        """arXiv ids (any version) that already went out in a digest, to `profile` if given."""
+        if profile is not None:
+            rows = self.conn.execute("SELECT DISTINCT arxiv_id FROM deliveries WHERE profile = ?", (profile,))
+        else:
+            rows = self.conn.execute("SELECT DISTINCT arxiv_id FROM papers WHERE status = ?", (STATUS_EMAILED,))
+        return {row[0] for row in rows}
+
+    def emailed_summaries(self, since=None):
+        """(arxiv_id, version, title, summary, emailed_at) of delivered papers, emailed after `since`."""
+        return self.conn.execute(
+            """
+            SELECT arxiv_id, version, title, summary, emailed_at FROM papers
+            WHERE status = ? AND summary IS NOT NULL AND emailed_at > ?
+            ORDER BY emailed_at
+            """,
+            (STATUS_EMAILED, since or 0),
+        ).fetchall()
+
+    def compact(self, retention_days=DEFAULT_RETENTION_DAYS):
+        """Drop entries untouched for `retention_days`; returns how many were removed.
+
+        arXiv searches are sorted by submission date, so papers this old no
+        longer show up in the candidate list and their rows can go.
+        """
+        cutoff = time.time() - retention_days * 24 * 60 * 60
+        cursor = self.conn.execute("DELETE FROM papers WHERE updated_at < ?", (cutoff,))
+        self.conn.execute("DELETE FROM deliveries WHERE emailed_at < ?", (cutoff,))
+        self.conn.commit()
+        if cursor.rowcount:
+            self.conn.execute("VACUUM")
+        return cursor.rowcount
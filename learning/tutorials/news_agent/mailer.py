@@ -0,0 +1,148 @@
+# Async SMTP delivery for the news agent
+# smtplib is blocking, so every SMTP command runs in a worker thread
+# (asyncio.to_thread) instead of stalling the event loop. One logged-in
+# session is kept alive and reused across messages, and it is checked with
+# NOOP before reuse. Transient failures (disconnects, timeouts, 4xx replies)
+# are retried on a fresh connection with jittered backoff.
+
+import asyncio
+import random
+import smtplib
+import time
+
+# Servers usually drop idle sessions after a few minutes; reconnect before that
+DEFAULT_IDLE_SECONDS = 240
+
+
+class MailerError(Exception):
+    """A message could not be delivered (permanent failure or out of retries)."""
+
+
+# Helper function: Whether an SMTP failure is worth another attempt on a new connection
+def is_transient(exc):
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    # SMTPException subclasses OSError; other SMTP errors (refused recipients,
+    # a missing extension) will fail the same way on a new connection
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+class SmtpMailer:
+    def __init__(
+        self,
+        host,
+        port,
+        username=None,
+        password=None,
+        timeout=30.0,
+        retries=3,
+        backoff=1.0,
+        idle_seconds=DEFAULT_IDLE_SECONDS,
+        require_tls=True,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.idle_seconds = idle_seconds
+        # Only a local test sink may go without STARTTLS; otherwise the login
+        # would send the password in cleartext
+        self.require_tls = require_tls
+        self.server = None
+        self.last_used = 0.0
+        self.connections = 0
+        self.messages_sent = 0
+        self._lock = None
+        self._lock_loop = None
+
+    def _get_lock(self):
+        # One session means one command stream; the lock is per event loop
+        # because the mailer may outlive an asyncio.run() call
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if server.has_extn("starttls"):
+                server.starttls()
+                server.ehlo()
+            elif self.require_tls:
+                # Fail closed: a stripped STARTTLS must not downgrade the session
+                raise smtplib.SMTPNotSupportedError(f"{self.host} does not offer STARTTLS")
+            if self.password and server.has_extn("auth"):
+                server.login(self.username, self.password)
+        except BaseException:
+            server.close()
+            raise
+        self.connections += 1
+        return server
+
+    def _drop(self):
+        if self.server is not None:
+            try:
+                self.server.close()
+            finally:
+                self.server = None
+
+    def _session(self):
+        """The kept-alive session, reconnecting if it went idle or stopped answering."""
+        if self.server is not None:
+            if time.monotonic() - self.last_used > self.idle_seconds:
+                self.close_blocking()
+            else:
+                try:
+                    if self.server.noop()[0] == 250:
+                        return self.server
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._drop()
+        self.server = self._connect()
+        return self.server
+
+    def _send_blocking(self, sender, recipients, message):
+        server = self._session()
+        refused = server.sendmail(sender, recipients, message)
+        self.last_used = time.monotonic()
+        return refused
+
+    def close_blocking(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop()
+
+    async def send(self, sender, recipients, message):
+        """Send `message` (a string) to every recipient in one envelope; returns the refused recipients."""
+        async with self._get_lock():
+            for attempt in range(self.retries + 1):
+                try:
+                    refused = await asyncio.to_thread(self._send_blocking, sender, list(recipients), message)
+                    self.messages_sent += 1
+                    if refused:
+                        print(f"Recipients refused by the server: {refused}")
+                    return refused
+                except (smtplib.SMTPException, OSError) as e:
+                    self._drop()
+                    if not is_transient(e):
+                        raise MailerError(f"Delivery failed: {e}") from e
+                    if attempt == self.retries:
+                        raise MailerError(f"Delivery failed after {self.retries + 1} attempts: {e}") from e
+                    delay = self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+                    print(f"SMTP delivery failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+    async def close(self):
+        async with self._get_lock():
+            await asyncio.to_thread(self.close_blocking)
@@ -0,0 +1,198 @@
+# Local per-stage metrics for the news agent
+# Records wall time, queue wait, LLM tokens (from the litellm `usage` field),
+# estimated cost, retries and cache hits for every pipeline stage, without
+# needing a hosted tracing service. Exports a JSON run report and a
+# Prometheus textfile (for node_exporter's textfile collector).
+
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+STAGES = ("search", "select", "download", "extract", "digest", "questions", "summary", "edit", "email")
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+}
+
+# The stage the current task is in, so LLM calls are billed to the right stage
+current_stage = contextvars.ContextVar("news_agent_stage", default=None)
+
+
+# Helper function: Read a field from a litellm Usage object or a plain dict
+def usage_value(usage, key, default=0):
+    if usage is None:
+        return default
+    if isinstance(usage, dict):
+        return usage.get(key) or default
+    return getattr(usage, key, None) or default
+
+
+# Helper function: Cached prompt tokens, reported under prompt_tokens_details
+def cached_prompt_tokens(usage):
+    return usage_value(usage_value(usage, "prompt_tokens_details", None), "cached_tokens")
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    prices = MODEL_PRICES.get(model.split("/")[-1])
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price) / 1_000_000
+
+
+def _empty_stage():
+    return {
+        "calls": 0,
+        "errors": 0,
+        "wall_seconds": 0.0,
+        "queue_wait_seconds": 0.0,
+        "llm_calls": 0,
+        "prompt_tokens": 0,
+        "cached_prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cost_usd": 0.0,
+        "retries": 0,
+        "cache_hits": 0,
+        "calls_avoided": 0,
+    }
+
+
+class RunMetrics:
+    def __init__(self, run_id=None):
+        self.run_id = run_id
+        self.started_at = time.time()
+        self.finished_at = None
+        self.stages = {}
+
+    def _stage(self, name=None):
+        name = name or current_stage.get() or "other"
+        if name not in self.stages:
+            self.stages[name] = _empty_stage()
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as `name`; LLM usage recorded inside it is billed to `name`."""
+        token = current_stage.set(name)
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self._stage(name)["errors"] += 1
+            raise
+        finally:
+            stats = self._stage(name)
+            stats["calls"] += 1
+            stats["wall_seconds"] += time.perf_counter() - started
+            current_stage.reset(token)
+
+    def record_queue_wait(self, seconds, stage=None):
+        self._stage(stage)["queue_wait_seconds"] += seconds
+
+    def record_llm_usage(self, model, usage, stage=None):
+        stats = self._stage(stage)
+        prompt_tokens = usage_value(usage, "prompt_tokens")
+        completion_tokens = usage_value(usage, "completion_tokens")
+        cached_tokens = cached_prompt_tokens(usage)
+        stats["llm_calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["cached_prompt_tokens"] += cached_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["cost_usd"] += estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+
+    def record_retry(self, stage=None):
+        self._stage(stage)["retries"] += 1
+
+    def record_cache_hit(self, stage=None):
+        self._stage(stage)["cache_hits"] += 1
+
+    def record_call_avoided(self, stage=None):
+        """An LLM call that a local check made unnecessary."""
+        self._stage(stage)["calls_avoided"] += 1
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    def report(self):
+        ordered = [name for name in STAGES if name in self.stages]
+        ordered += sorted(name for name in self.stages if name not in STAGES)
+        stages = {name: dict(self.stages[name]) for name in ordered}
+        totals = _empty_stage()
+        for stats in stages.values():
+            for key, value in stats.items():
+                totals[key] += value
+        for stats in [*stages.values(), totals]:
+            stats["wall_seconds"] = round(stats["wall_seconds"], 3)
+            stats["queue_wait_seconds"] = round(stats["queue_wait_seconds"], 3)
+            stats["cost_usd"] = round(stats["cost_usd"], 6)
+        finished_at = self.finished_at or time.time()
+        return {
+            "run_id": self.run_id,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "run_wall_seconds": round(finished_at - self.started_at, 3),
+            "stages": stages,
+            "totals": totals,
+        }
+
+    def write_json(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+        os.replace(tmp_path, path)
+
+    def write_prometheus(self, path):
+        """Write the report in the Prometheus text exposition format, atomically."""
+        report = self.report()
+        metrics = [
+            ("calls", "Times each stage ran"),
+            ("errors", "Stage runs that raised"),
+            ("wall_seconds", "Seconds spent in each stage, summed over papers"),
+            ("queue_wait_seconds", "Seconds spent waiting for a concurrency slot"),
+            ("llm_calls", "LLM completions billed to each stage"),
+            ("prompt_tokens", "Prompt tokens reported by the provider"),
+            ("cached_prompt_tokens", "Prompt tokens served from the provider prefix cache"),
+            ("completion_tokens", "Completion tokens reported by the provider"),
+            ("cost_usd", "Estimated cost in US dollars"),
+            ("retries", "Retried requests"),
+            ("cache_hits", "Responses served from a local cache"),
+            ("calls_avoided", "LLM calls skipped because a local check passed"),
+        ]
+        lines = [
+            "# HELP news_agent_last_run_wall_seconds Wall time of the last run",
+            "# TYPE news_agent_last_run_wall_seconds gauge",
+            f"news_agent_last_run_wall_seconds {report['run_wall_seconds']}",
+            "# HELP news_agent_last_run_timestamp_seconds When the last run finished",
+            "# TYPE news_agent_last_run_timestamp_seconds gauge",
+            f"news_agent_last_run_timestamp_seconds {self.finished_at or time.time():.0f}",
+        ]
+        for key, help_text in metrics:
+            name = f"news_agent_last_run_stage_{key}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for stage, stats in report["stages"].items():
+                lines.append(f'{name}{{stage="{stage}"}} {stats[key]}')
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        report = self.report()
+        print(f"\n{'stage':<10} {'calls':>5} {'wall_s':>8} {'queue_s':>8} {'llm':>4} {'prompt':>8} {'cached':>8} {'compl':>7} {'cost_$':>9} {'retry':>5} {'hits':>5} {'avoid':>5}")
+        for stage, s in [*report["stages"].items(), ("TOTAL", report["totals"])]:
+            print(
+                f"{stage:<10} {s['calls']:>5} {s['wall_seconds']:>8} {s['queue_wait_seconds']:>8} {s['llm_calls']:>4} "
+                f"{s['prompt_tokens']:>8} {s['cached_prompt_tokens']:>8} {s['completion_tokens']:>7} {s['cost_usd']:>9.4f} {s['retries']:>5} {s['cache_hits']:>5} {s['calls_avoided']:>5}"
+            )
+        totals = report["totals"]
+        if totals["prompt_tokens"]:
+            print(f"Provider prompt cache: {totals['cached_prompt_tokens'] / totals['prompt_tokens']:.0%} of prompt tokens")
+        print(f"Run wall time: {report['run_wall_seconds']}s")
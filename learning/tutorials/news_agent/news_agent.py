@@ -2,81 +2,310 @@
 # (base) cezarmihaila@CezarMihaila-16MBP-2151 learning % python -m venv agent_tutorial_env
 # (base) cezarmihaila@CezarMihaila-16MBP-2151 learning % source agent_tutorial_env/bin/activate
 
-import arxiv
+# Heavy dependencies (arxiv, litellm, PyPDF2, weave, wandb, dotenv) are imported
+# lazily where they are used, so importing this module has no side effects and
+# `news_agent.py --help` returns immediately.
+import argparse
 import asyncio
+import contextlib
+import functools
 import os
-from dotenv import load_dotenv
-from PyPDF2 import PdfReader
-from litellm import acompletion
-import weave
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import json
-import wandb 
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from downloader import create_http_client, download_pdf
+from arxiv_store import ArxivStore, newest_published
+from inference_cache import InferenceCache
+from pdf_extract import PdfExtractor
+from summarize import build_summary_prompt, summarize_map_reduce
+from ranking import prerank_candidates
+from ledger import PaperLedger
+from reference_index import ReferenceIndex
+from profiles import DEFAULT_PROFILE, ledger_profile, load_profiles, make_profile, profile_candidates, profile_stage
+from mailer import SmtpMailer
+from prompts import EDITOR_LAYOUT, QUESTIONS_LAYOUT, SELECTION_LAYOUT, PromptRegistry, paper_context
+from checkpoint import RunCheckpoint
+from metrics import RunMetrics, current_stage
+from scheduler import CompletionScheduler, STAGE_PRIORITIES, PRIORITY_NORMAL
+from editor_rules import check_editor_rules
+from fused_digest import DigestFormatError, build_digest_prompt, format_questions, parse_digest
 
-print('Imports done')
-print("Current working directory:", os.getcwd())
-# Load environment variables from secrets.env
-load_dotenv(os.path.join(os.path.dirname(__file__), '../../..', 'secrets.env'))
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SECRETS_FILE = os.path.join(AGENT_DIR, '../../..', 'secrets.env')
 
-# Authenticate with W&B using the API key
-# Get the WANDB_API_KEY at https://wandb.ai/authorize; https://wandb.ai/home?product=weave
-wandb_api_key = os.getenv("WANDB_API_KEY")
-wandb.login(key=wandb_api_key)
+DEFAULT_TOPICS = ["AI agents", "agentic workflows"]
+DEFAULT_MAX_RESULTS = 20
+DEFAULT_SELECT_PROMPT_FILE = os.path.join(AGENT_DIR, "select_research_prompt.txt")
+DEFAULT_QUESTION_PROMPT_FILE = os.path.join(AGENT_DIR, "generate_questions_prompt.txt")
+DEFAULT_SUMMARY_PROMPT_FILE = os.path.join(AGENT_DIR, "summary_prompt.txt")
+DEFAULT_EDITOR_PROMPT_FILE = os.path.join(AGENT_DIR, "editor_prompt.txt")
+REFERENCE_ARTICLE_FILES = [os.path.join(AGENT_DIR, f"article{i}.txt") for i in range(1, 4)]
 
-# Initialize Weave
-weave.init("news_agent")
-
-# Email configuration
-email = os.getenv("EMAIL")
-pswd = os.getenv("EMAIL_PASSWORD")
 LAST_EMAIL_FILE = "last_email.json"
+# Only the benchmark's local SMTP sink turns this off
+SMTP_REQUIRE_TLS = True
+ARXIV_STORE_FILE = "arxiv_store.sqlite3"
+LEDGER_FILE = "paper_ledger.sqlite3"
+REFERENCE_INDEX_FILE = "reference_index.sqlite3"
+RUNS_DIR = "runs"
+# New-style (2501.14684v1) and old-style (cs.AI/0601001v2) arXiv ids
+ARXIV_ID_PATTERN = re.compile(r"(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(v\d+)?")
+
+LLM_STAGES = ("select", "questions", "summary", "edit", "digest")
+# The fused digest writes the questions, a summary and the edited article in one answer
+STAGE_DEFAULT_OVERRIDES = {"digest": {"max_tokens": 3072}}
+
+
+# Helper function: Model settings for one stage, with its environment overrides applied
+def load_stage_model_config(stage):
+    prefix = f"NEWS_AGENT_{stage.upper()}_"
+    defaults = {**DEFAULT_MODEL_CONFIG, **STAGE_DEFAULT_OVERRIDES.get(stage, {})}
+    return {
+        "model": os.getenv(prefix + "MODEL", defaults["model"]),
+        "temperature": float(os.getenv(prefix + "TEMPERATURE", defaults["temperature"])),
+        "max_tokens": int(os.getenv(prefix + "MAX_TOKENS", defaults["max_tokens"])),
+    }
+
+
+# Read every NEWS_AGENT_* setting from the environment. Runs at import for the
+# defaults and again once secrets.env is loaded (see init_environment), so
+# settings kept in that file take effect.
+def load_settings():
+    global SMTP_HOST, SMTP_PORT, REFERENCE_MAX_CHARS, METRICS_TEXTFILE, LEDGER_RETENTION_DAYS
+    global INFERENCE_CACHE_FILE, PAPER_TOKEN_BUDGET, SUMMARY_MODE, SUMMARY_CHUNK_CHARS, SUMMARY_MAX_FANOUT
+    global DIGEST_MODE, PRERANK_TOP_K, SELECTION_MAX_PROMPT_CHARS, SELECTION_MAX_FINALISTS, MAX_CONCURRENT_PAPERS
+    global LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_MAX_CONCURRENCY
+    global DEFAULT_MODEL_CONFIG, STAGE_MODEL_CONFIG, EDITOR_GATE
+
+    SMTP_HOST = os.getenv("NEWS_AGENT_SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("NEWS_AGENT_SMTP_PORT", "587"))
+    # The style reference retrieved for each summary is trimmed to this many characters
+    REFERENCE_MAX_CHARS = int(os.getenv("NEWS_AGENT_REFERENCE_CHARS", "4000"))
+    # Point this at node_exporter's textfile directory to scrape the last run's metrics
+    METRICS_TEXTFILE = os.getenv("NEWS_AGENT_METRICS_TEXTFILE")
+    LEDGER_RETENTION_DAYS = int(os.getenv("NEWS_AGENT_LEDGER_RETENTION_DAYS", "180"))
+    INFERENCE_CACHE_FILE = os.getenv("NEWS_AGENT_INFERENCE_CACHE")
+    # Paper text sent to the question and summary stages is capped at roughly this
+    # many tokens; references and appendices are dropped first
+    PAPER_TOKEN_BUDGET = int(os.getenv("NEWS_AGENT_PAPER_TOKEN_BUDGET", "12000"))
+    # "single" sends the whole paper in one summary prompt; "map_reduce" summarizes
+    # section-aware chunks concurrently and then runs one reduce call
+    SUMMARY_MODE = os.getenv("NEWS_AGENT_SUMMARY_MODE", "single")
+    SUMMARY_CHUNK_CHARS = int(os.getenv("NEWS_AGENT_SUMMARY_CHUNK_CHARS", "8000"))
+    SUMMARY_MAX_FANOUT = int(os.getenv("NEWS_AGENT_SUMMARY_MAX_FANOUT", "4"))
+    # "staged" makes three calls per paper (questions, summary, edit); "fused" asks for
+    # all three in one JSON answer and falls back to "staged" if the answer does not parse
+    DIGEST_MODE = os.getenv("NEWS_AGENT_DIGEST_MODE", "staged")
+    # Candidates kept by the local pre-ranker before the LLM selection call
+    PRERANK_TOP_K = int(os.getenv("NEWS_AGENT_PRERANK_TOP_K", "40"))
+    # Search results that do not fit in a selection prompt of this many characters
+    # (~25k tokens) are split into shards of at most this size and selected as a
+    # tournament; a pre-ranked pool of ordinary abstracts fits in a single call
+    SELECTION_MAX_PROMPT_CHARS = int(os.getenv("NEWS_AGENT_SELECTION_MAX_PROMPT_CHARS", "100000"))
+    SELECTION_MAX_FINALISTS = int(os.getenv("NEWS_AGENT_SELECTION_MAX_FINALISTS", "15"))
+
+    # How many selected papers are processed at the same time
+    MAX_CONCURRENT_PAPERS = int(os.getenv("NEWS_AGENT_MAX_CONCURRENT_PAPERS", "5"))
+    # Provider rate limits shared by every LLM call (set them to your account's tier)
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("NEWS_AGENT_LLM_RPM", "500"))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("NEWS_AGENT_LLM_TPM", "200000"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("NEWS_AGENT_LLM_MAX_CONCURRENCY", "8"))
+
+    # Model settings for each LLM stage. Every value can be overridden per stage with
+    # NEWS_AGENT_<STAGE>_MODEL, NEWS_AGENT_<STAGE>_TEMPERATURE and NEWS_AGENT_<STAGE>_MAX_TOKENS
+    # (e.g. NEWS_AGENT_SELECT_MODEL=gpt-4o), or for all stages with NEWS_AGENT_MODEL.
+    DEFAULT_MODEL_CONFIG = {
+        "model": os.getenv("NEWS_AGENT_MODEL", "gpt-4o-mini"),
+        "temperature": 0.7,
+        "max_tokens": 1024,
+    }
+    STAGE_MODEL_CONFIG = {stage: load_stage_model_config(stage) for stage in LLM_STAGES}
+    # Skip the editor call when the summary already meets the editor prompt's rules
+    EDITOR_GATE = os.getenv("NEWS_AGENT_EDITOR_GATE", "1") != "0"
+
+
+load_settings()
+
+
+# Telemetry (W&B login + Weave tracing) is off until enable_telemetry() runs
+telemetry_enabled = False
+
+
+def enable_telemetry(project="news_agent"):
+    global telemetry_enabled
+    import wandb
+    import weave
+
+    # Authenticate with W&B using the API key
+    # Get the WANDB_API_KEY at https://wandb.ai/authorize; https://wandb.ai/home?product=weave
+    wandb.login(key=os.getenv("WANDB_API_KEY"))
+    # Initialize Weave
+    weave.init(project)
+    telemetry_enabled = True
+
+
+# Decorator: trace with weave.op when telemetry is enabled, run untraced otherwise
+def traced(fn):
+    weave_fn = None
+
+    def get_weave_fn():
+        nonlocal weave_fn
+        if weave_fn is None:
+            import weave
+
+            weave_fn = weave.op(fn)
+        return weave_fn
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if not telemetry_enabled:
+                return await fn(*args, **kwargs)
+            return await get_weave_fn()(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not telemetry_enabled:
+            return fn(*args, **kwargs)
+        return get_weave_fn()(*args, **kwargs)
+
+    return wrapper
+
+
+# Helper function: Weave call ID of the running op, or None without telemetry
+def current_call_id():
+    if not telemetry_enabled:
+        return None
+    import weave
+
+    call = weave.get_current_call()
+    return call.id if call else None
+
+
+# The completion function, loaded from litellm on first use. Benchmarks and
+# tests can assign a fake with the same signature.
+acompletion = None
+
+
+def get_acompletion():
+    global acompletion
+    if acompletion is None:
+        from litellm import acompletion as litellm_acompletion
+
+        acompletion = litellm_acompletion
+    return acompletion
+
+
+# Per-stage metrics of the current run (replaced at the start of every main())
+run_metrics = RunMetrics()
+
+
+# Optional on-disk response cache, enabled by setting NEWS_AGENT_INFERENCE_CACHE
+# to a cache file path (see configure_inference_cache)
+inference_cache = None
+
+
+def configure_inference_cache(path):
+    global inference_cache
+    inference_cache = InferenceCache(path) if path else None
+    return inference_cache
+
+
+# Rate-limit-aware scheduler every LLM call goes through (see configure_scheduler).
+# Without one, run_inference calls the model directly.
+completion_scheduler = None
+# Its asyncio primitives belong to the event loop it was created in
+completion_scheduler_loop = None
 
 
-# Helper function: Run model inference
-async def run_inference(query):
+def configure_scheduler(requests_per_minute=None, tokens_per_minute=None, max_concurrency=None, enabled=True):
+    global completion_scheduler, completion_scheduler_loop
+    completion_scheduler = None
+    try:
+        completion_scheduler_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        completion_scheduler_loop = None
+    if enabled:
+        completion_scheduler = CompletionScheduler(
+            # Looked up per call, so a fake assigned to `acompletion` is still used
+            lambda **kwargs: get_acompletion()(**kwargs),
+            requests_per_minute=requests_per_minute or LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=tokens_per_minute or LLM_TOKENS_PER_MINUTE,
+            max_concurrency=max_concurrency or LLM_MAX_CONCURRENCY,
+        )
+    return completion_scheduler
+
+
+# Helper function: Run model inference with the settings of `stage` (the current metrics stage by default)
+async def run_inference(query, stage=None, json_mode=False):
     api_key = os.getenv("OPENAI_API_KEY")
-    model_name = "gpt-4o-mini"
-    response = await acompletion(
-        model=model_name,
-        api_key=api_key,
-        messages=[{"role": "user", "content": query}],
-        temperature=0.7,
-        max_tokens=1024,
-    )
-    return response["choices"][0]["message"]["content"]
+    config = STAGE_MODEL_CONFIG.get(stage or current_stage.get(), DEFAULT_MODEL_CONFIG)
+    model_name = config["model"]
+    messages = [{"role": "user", "content": query}]
+    temperature = config["temperature"]
+    max_tokens = config["max_tokens"]
+
+    called_model = False
+
+    async def call_model():
+        nonlocal called_model
+        called_model = True
+        request = dict(
+            model=model_name,
+            api_key=api_key,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        if json_mode:
+            request["response_format"] = {"type": "json_object"}
+        if completion_scheduler is None:
+            response = await get_acompletion()(**request)
+        else:
+            # Selection runs ahead of the bulk of summary calls
+            response = await completion_scheduler.submit(
+                priority=STAGE_PRIORITIES.get(current_stage.get(), PRIORITY_NORMAL),
+                on_wait=run_metrics.record_queue_wait,
+                on_retry=run_metrics.record_retry,
+                **request,
+            )
+        run_metrics.record_llm_usage(model_name, response.get("usage"))
+        return response["choices"][0]["message"]["content"]
+
+    if inference_cache is None:
+        return await call_model()
+    key = InferenceCache.make_key(model_name, messages, temperature, max_tokens)
+    content = await inference_cache.get_or_call(key, call_model)
+    if not called_model:
+        run_metrics.record_cache_hit()
+    return content
+
+
+# Prompt files are loaded once and reloaded only when they change on disk
+prompt_registry = PromptRegistry()
 
 
 # Helper function: Read a prompt from a file
 def read_prompt(file_path):
-    print("read_prompt from file_path:" + file_path)
-    with open(file_path, "r") as file:
-        return file.read()
-
-
-# Helper function: Read a reference article
-def read_reference_article(article_file):
-    if not os.path.exists(article_file):
-        return ""
-        
-    if article_file.endswith('.pdf'):
-        return read_pdf_first_50_pages(article_file)
-    else:
-        try:
-            with open(article_file, "r") as file:
-                return file.read().strip()
-        except UnicodeDecodeError:
-            print(f"Could not read {article_file} as text file")
-            return ""
+    return prompt_registry.get(file_path)
 
 
 # Helper function: Format Arxiv results
 def format_arxiv_results(results):
+    # json.dumps escapes the quotes and backslashes that abstracts often contain
     return "[" + ",\n".join(
         [
-            f'{{"index": {i+1}, "title": "{result["title"]}", "summary": "{result["summary"]}", "url": "{result["url"]}"}}'
+            json.dumps(
+                {"index": i + 1, "title": result["title"], "summary": result["summary"], "url": result["url"]},
+                ensure_ascii=False,
+            )
             for i, result in enumerate(results)
         ]
     ) + "]"
@@ -87,58 +316,235 @@ def convert_to_pdf_url(abs_url):
     return abs_url.replace("/abs/", "/pdf/")
 
 
-# Helper function: Read the first 10 pages of a PDF
-def read_pdf_first_50_pages(pdf_path):
-    try:
-        with open(pdf_path, "rb") as file:
-            reader = PdfReader(file)
-            return "\n".join(page.extract_text() for page in reader.pages[:50])
-    except Exception:
-        return ""
+# Search a single topic, yielding papers as the arXiv client pages through them.
+# Stops as soon as `stop_event` is set (by this or another topic's consumer), so
+# no further result pages are requested. With `since`, only papers submitted
+# after that datetime are requested.
+def search_arxiv_topic(topic, max_results, stop_event=None, since=None):
+    import arxiv
+
+    query = topic
+    if since is not None:
+        now = datetime.now(since.tzinfo)
+        query = f"({topic}) AND submittedDate:[{since:%Y%m%d%H%M} TO {now:%Y%m%d%H%M}]"
+    search = arxiv.Search(
+        query=query,
+        max_results=max_results,
+        sort_by=arxiv.SortCriterion.SubmittedDate
+    )
+    for result in search.results():
+        if stop_event is not None and stop_event.is_set():
+            return
+        # Results are newest first, so everything from here on was seen already
+        if since is not None and result.published <= since:
+            return
+        yield {
+            "title": result.title,
+            "summary": result.summary.replace("\n", " "),
+            "url": result.entry_id,
+            "published": result.published.isoformat(),
+        }
 
 
 # Arxiv search function
-@weave.op
-def get_arxiv_possibilities(topics, max_results=200):
-    # Calculate the date 24 hours ago
-    # start_date = datetime.now() - timedelta(days=1)  # Remove this line if not needed
-    
-    all_results = []
+@traced
+def get_arxiv_possibilities(
+    topics, max_results=200, max_unique=None, max_workers=4, store=None, full_refresh=False, new_watermarks=None
+):
+    """Search all topics concurrently and merge the results by entry_id.
+
+    Each paper appears once, with a "topics" list of every topic that matched it.
+    When `max_unique` is set, the remaining searches stop once that many unique
+    papers have been seen.
+
+    With an ArxivStore, each topic only asks for submissions newer than its
+    stored watermark, and a repeated query inside the store's TTL is answered
+    from the cache. `full_refresh` ignores both and fetches from scratch.
+    Given a `new_watermarks` dict, the store's watermarks are not moved; the
+    newest submission date of each searched topic is put there instead, for
+    the caller to commit once the papers were delivered.
+    """
+    per_topic_results = {}
+    watermarks = {}
+    if store is not None and not full_refresh:
+        for topic in topics:
+            cached = store.get_cached_query(topic, max_results)
+            if cached is not None:
+                print(f"Using cached arXiv results for '{topic}' ({len(cached)} papers)")
+                per_topic_results[topic] = cached
+                # A cached answer may come from a run that never delivered it
+                newest = newest_published(cached)
+                if new_watermarks is not None and newest is not None:
+                    new_watermarks[topic] = newest.isoformat()
+            else:
+                watermarks[topic] = store.get_watermark(topic)
+    topics_to_search = [topic for topic in topics if topic not in per_topic_results]
+
+    stop_event = threading.Event()
+    seen_lock = threading.Lock()
+    seen_ids = set()
+
+    def search_topic(topic):
+        results = []
+        for result in search_arxiv_topic(topic, max_results, stop_event, since=watermarks.get(topic)):
+            results.append(result)
+            with seen_lock:
+                seen_ids.add(result["url"])
+                if max_unique is not None and len(seen_ids) >= max_unique:
+                    stop_event.set()
+        return results
+
+    if topics_to_search:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(topics_to_search)))) as executor:
+            fetched = list(executor.map(search_topic, topics_to_search))
+        for topic, results in zip(topics_to_search, fetched):
+            per_topic_results[topic] = results
+            # Only complete searches may move the watermark forward
+            if store is not None and not stop_event.is_set():
+                newest = store.record_search(topic, max_results, results, move_watermark=new_watermarks is None)
+                if new_watermarks is not None and newest is not None:
+                    new_watermarks[topic] = newest.isoformat()
+
+    # Merge in topic order so the output does not depend on thread timing
+    merged = {}
     for topic in topics:
-        search = arxiv.Search(
-            query=topic,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate
-            # Remove start_date if not supported
-        )
-        all_results.extend([
-            {"title": result.title, "summary": result.summary.replace("\n", " "), "url": result.entry_id}
-            for result in search.results()
-        ])
-    
+        for result in per_topic_results[topic]:
+            paper = merged.get(result["url"])
+            if paper is None:
+                merged[result["url"]] = {**result, "topics": [topic]}
+            elif topic not in paper["topics"]:
+                paper["topics"].append(topic)
+
+    all_results = list(merged.values())
+    if max_unique is not None:
+        all_results = all_results[:max_unique]
+    print(f"Found {len(all_results)} unique papers across {len(topics)} topics")
     return all_results
 
 
+# Helper function: Move the arXiv watermarks forward once a run's papers were delivered
+def commit_watermarks(watermarks):
+    if not watermarks:
+        return
+    with ArxivStore(ARXIV_STORE_FILE) as store:
+        for topic, newest_submitted in watermarks.items():
+            store.update_watermark(topic, datetime.fromisoformat(newest_submitted))
+    print(f"Moved the arXiv watermarks of {len(watermarks)} topics forward")
+
+
+# Helper function: Extract the arXiv id and version ("2501.14684", "v1") from a URL or text
+def parse_arxiv_id(text):
+    match = ARXIV_ID_PATTERN.search(text)
+    if not match:
+        return None, None
+    return match.group(1), match.group(2) or ""
+
+
+# Helper function: Index papers by versioned and unversioned arXiv id
+def build_paper_index(papers):
+    index = {}
+    for paper in papers:
+        arxiv_id, version = parse_arxiv_id(paper["url"])
+        index[paper["url"]] = paper
+        if arxiv_id:
+            index[arxiv_id + version] = paper
+            index.setdefault(arxiv_id, paper)
+    return index
+
+
+# Helper function: Map the model's comma-separated URLs back to papers
+def match_selected_papers(selected_response, paper_index):
+    selected_papers = []
+    seen = set()
+    for token in selected_response.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        arxiv_id, version = parse_arxiv_id(token)
+        paper = paper_index.get(token)
+        if paper is None and arxiv_id:
+            paper = paper_index.get(arxiv_id + version) or paper_index.get(arxiv_id)
+        if paper is not None and paper["url"] not in seen:
+            seen.add(paper["url"])
+            selected_papers.append(paper)
+    return selected_papers
+
+
+# One LLM selection call over a list of candidates
+async def run_selection_round(candidates, selection_prompt):
+    formatted_results = format_arxiv_results(candidates)
+    query = SELECTION_LAYOUT.safe_substitute(instructions=selection_prompt, search_results=formatted_results)
+    selected_response = await run_inference(query)
+    return match_selected_papers(selected_response, build_paper_index(candidates))
+
+
+# Helper function: Split candidates, in order, into shards whose formatted results stay under max_chars
+def shard_by_payload(candidates, max_chars):
+    shards = [[]]
+    shard_chars = 0
+    for candidate in candidates:
+        size = len(format_arxiv_results([candidate]))
+        if shards[-1] and shard_chars + size > max_chars:
+            shards.append([])
+            shard_chars = 0
+        shards[-1].append(candidate)
+        shard_chars += size
+    return shards
+
+
+# Tournament selection: concurrent per-shard rounds, then a final round over the shard winners
+async def run_sharded_selection(candidates, selection_prompt, max_chars, max_finalists):
+    shards = shard_by_payload(candidates, max_chars)
+    print(f"Selecting from {len(candidates)} candidates in {len(shards)} shards of up to {max_chars} characters")
+    shard_results = await asyncio.gather(
+        *(run_selection_round(shard, selection_prompt) for shard in shards),
+        return_exceptions=True,
+    )
+    shard_winners = []
+    for shard_number, result in enumerate(shard_results):
+        if isinstance(result, Exception):
+            print(f"Selection shard {shard_number + 1} failed: {result}")
+        else:
+            shard_winners.append(result)
+
+    # Interleave the shard winners so every shard is represented before any is cut
+    finalists = []
+    for rank in range(max((len(winners) for winners in shard_winners), default=0)):
+        finalists.extend(winners[rank] for winners in shard_winners if rank < len(winners))
+    finalists = finalists[:max_finalists]
+    if len(finalists) <= 1:
+        return finalists
+    return await run_selection_round(finalists, selection_prompt)
+
+
 # Select the best Arxiv papers with call ID
-@weave.op
+@traced
 async def select_best_arxiv_papers(possibilities, prompt_file):
     if not possibilities:
         return None, None, None
 
     # Get the Weave call ID
-    call_id = weave.get_current_call().id
-    formatted_results = format_arxiv_results(possibilities)
+    call_id = current_call_id()
     selection_prompt = read_prompt(prompt_file)
-    query = f"{selection_prompt}\n\nSearch Results:\n{formatted_results}\n\nRespond with ONLY the URLs of the papers you recommend, separated by commas, nothing else."
-    selected_response = await run_inference(query)
-    selected_urls = [url.strip() for url in selected_response.split(",") if url.strip()]
 
-    # Match the selected URLs to possibilities for additional details
-    selected_papers = [
-        next((item for item in possibilities if item["url"] in url), None)
-        for url in selected_urls
-    ]
-    selected_papers = [paper for paper in selected_papers if paper is not None]
+    # Only the locally pre-ranked top candidates go into the LLM prompt
+    candidates = prerank_candidates(possibilities, selection_prompt, top_k=PRERANK_TOP_K)
+    if len(candidates) < len(possibilities):
+        full_size = len(format_arxiv_results(possibilities))
+        kept_size = len(format_arxiv_results(candidates))
+        print(
+            f"Pre-ranking kept {len(candidates)}/{len(possibilities)} candidates; "
+            f"selection payload {full_size} -> {kept_size} characters "
+            f"({100 * (1 - kept_size / full_size):.0f}% smaller)"
+        )
+
+    # Only pools too large for one prompt are split into shards, so selection latency stays flat
+    if len(format_arxiv_results(candidates)) > SELECTION_MAX_PROMPT_CHARS:
+        selected_papers = await run_sharded_selection(
+            candidates, selection_prompt, SELECTION_MAX_PROMPT_CHARS, SELECTION_MAX_FINALISTS
+        )
+    else:
+        selected_papers = await run_selection_round(candidates, selection_prompt)
 
     return (
         [convert_to_pdf_url(paper["url"]) for paper in selected_papers],
@@ -148,35 +554,68 @@ async def select_best_arxiv_papers(possibilities, prompt_file):
 
 
 # Generate questions from the paper content
-@weave.op
+@traced
 async def generate_questions_from_paper(paper_text, prompt_file):
     print("generate_questions_from_paper")
     # Print only the first 10 lines of the paper_text
     print("paper_text:", "\n".join(paper_text.splitlines()[:10]))
-    question_prompt = read_prompt(prompt_file)
-    prompt = f"{question_prompt}\n\nText:\n{paper_text}\n\nPlease provide a list of questions."
+    prompt = prompt_registry.render(
+        prompt_file, QUESTIONS_LAYOUT, paper_text=paper_text, paper_context=paper_context(paper_text)
+    )
     return await run_inference(prompt)
 
 
 # Generate a summary of the paper
-@weave.op
+@traced
 async def generate_summary_from_paper(paper_text, questions, summary_prompt_file, reference_text):
     summary_prompt = read_prompt(summary_prompt_file)
-    prompt = (
-        f"{summary_prompt}\n\nPREVIOUS Reference Article:\n{reference_text}\n\n"
-        f"List of Questions to address in the article:\n{questions}\n\nPaper Content:\n{paper_text}"
-    )
+    if SUMMARY_MODE == "map_reduce":
+        return await summarize_map_reduce(
+            paper_text,
+            questions,
+            summary_prompt,
+            reference_text,
+            run_inference,
+            chunk_chars=SUMMARY_CHUNK_CHARS,
+            max_fanout=SUMMARY_MAX_FANOUT,
+        )
+    prompt = build_summary_prompt(summary_prompt, reference_text, questions, paper_text)
     return await run_inference(prompt)
 
 
 # Edit the generated summary
-@weave.op
+@traced
 async def edit_summary(summary, editor_prompt_file):
-    editor_prompt = read_prompt(editor_prompt_file)
-    prompt = f"{editor_prompt}\n\nArticle Content:\n{summary}"
+    if EDITOR_GATE:
+        problems = check_editor_rules(summary)
+        if not problems:
+            print("Summary already meets the editor rules, skipping the edit call")
+            run_metrics.record_call_avoided()
+            return summary
+        print(f"Sending the summary to the editor: {'; '.join(problems)}")
+    prompt = prompt_registry.render(editor_prompt_file, EDITOR_LAYOUT, article=summary)
     return await run_inference(prompt)
 
 
+# Fused mode: questions, summary and edited article from one call.
+# Returns None when the answer does not match the schema, so the caller can fall back.
+@traced
+async def generate_fused_digest(paper_text, question_prompt_file, summary_prompt_file, editor_prompt_file, reference_text):
+    prompt = build_digest_prompt(
+        read_prompt(question_prompt_file),
+        read_prompt(summary_prompt_file),
+        read_prompt(editor_prompt_file),
+        paper_text,
+        reference_text,
+    )
+    response = await run_inference(prompt, json_mode=True)
+    try:
+        return parse_digest(response)
+    except DigestFormatError as e:
+        print(f"Fused digest answer rejected ({e})")
+        return None
+
+
 # Save email details to a file
 async def save_last_email(subject, body, call_id=None, call_url=None):
     """Save the subject, body, Weave call ID, and call URL of the last email sent."""
@@ -187,120 +626,416 @@ async def save_last_email(subject, body, call_id=None, call_url=None):
 
 
 
+# The W&B entity does not change while the process runs, so it is looked up once
+wandb_username = None
+
+
 def get_wandb_username():
+    global wandb_username
+    if wandb_username is not None:
+        return wandb_username
+    import wandb
+
     try:
         # Initialize the W&B API
         api = wandb.Api()
         # Fetch the username of the authenticated user
-        return api.default_entity
+        wandb_username = api.default_entity
+        return wandb_username
     except Exception as e:
         print(f"Error fetching W&B username: {e}")
         return "unknown_user"
 
 
+# One kept-alive SMTP session per process (see get_mailer)
+mailer = None
+
+
+# Helper function: The shared mailer, recreated if the server or the credentials change
+def get_mailer(sender_email, sender_password):
+    global mailer
+    settings = (SMTP_HOST, SMTP_PORT, sender_email, sender_password, SMTP_REQUIRE_TLS)
+    if mailer is None or (mailer.host, mailer.port, mailer.username, mailer.password, mailer.require_tls) != settings:
+        if mailer is not None:
+            mailer.close_blocking()
+        mailer = SmtpMailer(SMTP_HOST, SMTP_PORT, sender_email, sender_password, require_tls=SMTP_REQUIRE_TLS)
+    return mailer
+
+
 # Send an email
 async def send_email(subject, body, recipient_email, sender_email, sender_password, main_call_id=None, selection_call_id=None):
     try:
-        # Dynamically fetch W&B username
-        username = get_wandb_username()
-        call_url = f"https://wandb.ai/{username}/news_agent/r/call/{main_call_id}" if main_call_id else None
+        # Fetch the W&B username (only needed when there is a trace to link) without blocking the loop
+        call_url = None
+        if main_call_id:
+            username = await asyncio.to_thread(get_wandb_username)
+            call_url = f"https://wandb.ai/{username}/news_agent/r/call/{main_call_id}"
+        recipients = [recipient_email] if isinstance(recipient_email, str) else list(recipient_email)
 
 
         msg = MIMEMultipart()
         msg["From"] = sender_email
-        msg["To"] = recipient_email
+        msg["To"] = ", ".join(recipients)
         msg["Subject"] = subject
         msg.attach(MIMEText(f"{body}\n\nView the process log: {call_url}", "plain"))
 
 
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
+        # All recipients go in one envelope over the shared session
+        refused = await get_mailer(sender_email, sender_password).send(sender_email, recipients, msg.as_string())
+        recipients = [recipient for recipient in recipients if recipient not in refused]
 
 
-        print(f"Email sent to {recipient_email}")
+        print(f"Email sent to {', '.join(recipients)}")
         await save_last_email(subject, body, selection_call_id, call_url)
+        return True
     except Exception as e:
         print(f"Failed to send email: {e}")
+        return False
+
+
+# Process a single selected paper: download, extract, questions, summary, edit.
+# Each step is checkpointed, so a resumed run skips whatever already finished.
+@traced
+async def process_paper(http_client, pdf_extractor, pdf_url, selected_title, question_prompt_file, summary_prompt_file, editor_prompt_file, downloaded_pdfs, ledger=None, checkpoint=None, reference_index=None):
+    print(f"Selected Paper: {selected_title}")
+    arxiv_url = pdf_url.replace("/pdf/", "/abs/").rstrip(".pdf")
+    arxiv_id, version = parse_arxiv_id(pdf_url)
+    pdf_path = f"{pdf_url.split('/')[-1]}.pdf"
+    paper_key = f"{arxiv_id}{version}" if arxiv_id else pdf_path
+
+    def load_step(stage):
+        return checkpoint.load(stage, paper_key) if checkpoint else None
+
+    def save_step(stage, result):
+        if checkpoint:
+            checkpoint.save(stage, result, paper_key)
+        return result
+
+    # A paper summarized on an earlier run (e.g. one whose email failed) is reused as is
+    stored_summary = ledger.get_summary(arxiv_id, version) if ledger and arxiv_id else None
+    if stored_summary:
+        print(f"Reusing the stored summary for {selected_title}")
+        return f"=== Paper: {selected_title} ===\nArXiv URL: {arxiv_url}\n\n{stored_summary}\n\n"
+
+    edited_summary = load_step("edit")
+    if edited_summary is None:
+        # Extract the budgeted content once
+        paper_text = load_step("extraction")
+        if paper_text is None:
+            with run_metrics.stage("download"):
+                await download_pdf(
+                    http_client, pdf_url, pdf_path, on_retry=lambda: run_metrics.record_retry("download")
+                )
+            downloaded_pdfs.append(pdf_path)
+            save_step("download", pdf_path)
+
+            with run_metrics.stage("extract"):
+                extraction = await pdf_extractor.extract(
+                    pdf_path, max_pages=50, max_tokens=PAPER_TOKEN_BUDGET, skip_back_matter=True
+                )
+            if extraction.get("cached"):
+                run_metrics.record_cache_hit("extract")
+            if not extraction["text"].strip():
+                print(f"Could not extract any text from {pdf_path}. Skipping...")
+                return None
+            paper_text = save_step("extraction", extraction["text"])
+        # Style reference: the most similar past digest or reference article, not the paper itself
+        reference = None
+        if reference_index is not None:
+            reference = reference_index.best_match(paper_text, REFERENCE_MAX_CHARS, exclude=f"arxiv:{paper_key}")
+        reference_text = reference["text"] if reference else ""
+        if reference:
+            print(f"Style reference for {selected_title}: {reference['title']} ({reference['kind']})")
+
+        questions = load_step("questions")
+        summary_output = load_step("summary")
+        if DIGEST_MODE == "fused" and questions is None and summary_output is None:
+            print(f"Generating the fused digest for {selected_title}...")
+            with run_metrics.stage("digest"):
+                digest = await generate_fused_digest(
+                    paper_text, question_prompt_file, summary_prompt_file, editor_prompt_file, reference_text
+                )
+            if digest is None:
+                print("Falling back to the three-stage path")
+            else:
+                questions = save_step("questions", format_questions(digest["questions"]))
+                # The edited article still passes through edit_summary, whose local
+                # gate only spends an edit call if it breaks the editor rules
+                summary_output = save_step("summary", digest["article"])
+
+        if questions is None:
+            print("Generating questions based on the paper content...")
+            with run_metrics.stage("questions"):
+                questions = await generate_questions_from_paper(paper_text, question_prompt_file)
+            save_step("questions", questions)
+
+        # Generate summary for this paper
+        if summary_output is None:
+            print(f"\n=== Generating Summary for {selected_title} ===")
+            with run_metrics.stage("summary"):
+                summary_output = await generate_summary_from_paper(
+                    paper_text, questions, summary_prompt_file, reference_text
+                )
+            save_step("summary", summary_output)
+
+        print(f"Editing Summary for {selected_title}...")
+        with run_metrics.stage("edit"):
+            edited_summary = await edit_summary(summary_output, editor_prompt_file)
+        save_step("edit", edited_summary)
+    else:
+        print(f"Resumed the finished summary for {selected_title}")
+
+    if ledger and arxiv_id:
+        ledger.save_summary(arxiv_id, version, selected_title, edited_summary)
+
+    return f"=== Paper: {selected_title} ===\nArXiv URL: {arxiv_url}\n\n{edited_summary}\n\n"
+
+
+# Helper function: Index new or changed reference articles and newly published digests
+def sync_reference_index(reference_index, ledger):
+    added = reference_index.add_files(REFERENCE_ARTICLE_FILES)
+    rows = ledger.emailed_summaries(since=reference_index.latest_mtime())
+    added += reference_index.sync_digests(
+        (f"arxiv:{arxiv_id}{version}", title, summary, emailed_at) for arxiv_id, version, title, summary, emailed_at in rows
+    )
+    if added:
+        print(f"Reference index: {added} articles added or updated, {reference_index.count()} in total")
 
 
 # Update the main function to handle multiple selected papers
-@weave.op
-async def main():
-    main_call_id = weave.get_current_call().id
+@traced
+async def main(
+    topics=DEFAULT_TOPICS,
+    max_results=DEFAULT_MAX_RESULTS,
+    select_prompt_file=DEFAULT_SELECT_PROMPT_FILE,
+    question_prompt_file=DEFAULT_QUESTION_PROMPT_FILE,
+    summary_prompt_file=DEFAULT_SUMMARY_PROMPT_FILE,
+    editor_prompt_file=DEFAULT_EDITOR_PROMPT_FILE,
+    recipients=None,
+    max_concurrent_papers=None,
+    full_refresh=False,
+    resume_run_id=None,
+    profiles=None,
+    http_client=None,
+    pdf_extractor=None,
+):
+    """Run one digest. A long-running caller (daemon.py) can pass its warm
+    `http_client` and `pdf_extractor`; otherwise they are created for this run."""
+    global run_metrics
+    main_call_id = current_call_id()
+    max_concurrent_papers = max_concurrent_papers or MAX_CONCURRENT_PAPERS
+    # Without a profile file, the arguments describe a single reader
+    if not profiles:
+        profiles = [make_profile(DEFAULT_PROFILE, topics, select_prompt_file, recipients, max_results)]
+
+    # Every stage is checkpointed under runs/<run-id>/ so a failed run can be resumed
+    if resume_run_id:
+        checkpoint = RunCheckpoint.resume(resume_run_id, RUNS_DIR)
+        print(f"Resuming run {checkpoint.run_id}, completed so far: {checkpoint.completed_stages()}")
+    else:
+        checkpoint = RunCheckpoint.create(RUNS_DIR)
+        print(f"Starting run {checkpoint.run_id} (resume with --resume {checkpoint.run_id})")
+    run_metrics = RunMetrics(checkpoint.run_id)
+    configure_inference_cache(INFERENCE_CACHE_FILE)
+    # In a daemon, the scheduler keeps its learned concurrency from run to run
+    if completion_scheduler is None or completion_scheduler_loop is not asyncio.get_running_loop():
+        configure_scheduler()
+
+    # The report, the metrics export and the cache teardown run however the run ends
+    try:
+        await run_digest(
+            checkpoint, profiles, resume_run_id, question_prompt_file, summary_prompt_file, editor_prompt_file,
+            max_concurrent_papers, full_refresh, http_client, pdf_extractor, main_call_id,
+        )
+    finally:
+        if inference_cache is not None:
+            print("Inference cache stats:", inference_cache.stats())
+            inference_cache.close()
+            configure_inference_cache(None)
+        print("LLM scheduler stats:", completion_scheduler.stats)
+
+        # Where the run's minutes and dollars went
+        run_metrics.finish()
+        run_metrics.print_summary()
+        run_metrics.write_json(os.path.join(checkpoint.run_dir, "metrics.json"))
+        run_metrics.write_prometheus(METRICS_TEXTFILE or os.path.join(checkpoint.run_dir, "metrics.prom"))
+
+
+# The stages of one run, from search to email; main() sets up and reports around it
+async def run_digest(
+    checkpoint, profiles, resume_run_id, question_prompt_file, summary_prompt_file, editor_prompt_file,
+    max_concurrent_papers, full_refresh, http_client, pdf_extractor, main_call_id,
+):
+    # Email configuration
+    sender_email = os.getenv("EMAIL")
+    sender_password = os.getenv("EMAIL_PASSWORD")
+    if resume_run_id and all(checkpoint.load(profile_stage("email", profile)) for profile in profiles):
+        print("This run already sent its email; nothing left to do.")
+        return
+    pending_profiles = [profile for profile in profiles if not checkpoint.load(profile_stage("email", profile))]
 
-    # topic = "machine learning"
-    topics = ["AI agents", "agentic workflows"] 
     # topics = ["cs.AI", "cs.CL", "cs.DC"]
-    select_prompt_file = "select_research_prompt.txt"
-    question_prompt_file = "generate_questions_prompt.txt"
-    summary_prompt_file = "summary_prompt.txt"
-    editor_prompt_file = "editor_prompt.txt"
-    # reference_files = ["article1.txt", "article2.txt", "article3.txt"]
-
-    # Step 1: Get Arxiv possibilities
-    print("Searching Arxiv...")
-    possibilities = get_arxiv_possibilities(topics, max_results=20)
+
+    # Step 1: Get Arxiv possibilities, searching the union of every profile's topics once
+    ledger = PaperLedger(LEDGER_FILE)
+    all_topics = list(dict.fromkeys(topic for profile in pending_profiles for topic in profile["topics"]))
+    search = checkpoint.load("search")
+    if isinstance(search, list):
+        # Checkpoints written before watermarks were deferred hold only the papers
+        search = {"papers": search, "watermarks": {}}
+    if search is None:
+        print("Searching Arxiv...")
+        # The watermarks only move once this run's papers were delivered (see commit_watermarks)
+        new_watermarks = {}
+        with run_metrics.stage("search"), ArxivStore(ARXIV_STORE_FILE) as store:
+            possibilities = get_arxiv_possibilities(
+                all_topics,
+                max_results=max(profile["max_results"] for profile in pending_profiles),
+                store=store,
+                full_refresh=full_refresh,
+                new_watermarks=new_watermarks,
+            )
+        search = checkpoint.save("search", {"papers": possibilities, "watermarks": new_watermarks})
+    possibilities = search["papers"]
+    if not possibilities:
+        print("No new papers since the last run.")
+        ledger.close()
+        return
     print("Arxiv possibilities length:", len(possibilities))
     print("Arxiv possibilities type:", type(possibilities))
     print("Arxiv 1st possibility:", possibilities[0])
 
-    # Step 2: Select the best papers
+    # Step 2: Select the best papers for each profile
     # print("select_best_arxiv_papers:\n", await select_best_arxiv_papers(possibilities, select_prompt_file))
-    pdf_urls, selected_titles, selection_call_id = await select_best_arxiv_papers(possibilities, select_prompt_file)
-    if not pdf_urls:
+    async def select_for_profile(profile):
+        stage = profile_stage("selection", profile)
+        selection = checkpoint.load(stage)
+        if selection is not None:
+            return selection
+        # Papers that already went out to this reader never reach the selector again
+        emailed_ids = ledger.emailed_ids(ledger_profile(profile))
+        candidates = profile_candidates(possibilities, profile)
+        unseen = [paper for paper in candidates if parse_arxiv_id(paper["url"])[0] not in emailed_ids]
+        print(f"[{profile['name']}] Ledger filtered out {len(candidates) - len(unseen)} already digested papers")
+        pdf_urls, selected_titles, selection_call_id = [], [], None
+        if unseen:
+            with run_metrics.stage("select"):
+                pdf_urls, selected_titles, selection_call_id = await select_best_arxiv_papers(
+                    unseen, profile["select_prompt_file"]
+                )
+        return checkpoint.save(
+            stage, {"pdf_urls": pdf_urls or [], "titles": selected_titles or [], "call_id": selection_call_id}
+        )
+
+    selections = await asyncio.gather(*(select_for_profile(profile) for profile in pending_profiles))
+
+    # Every selected paper is digested once, however many profiles picked it
+    unique_papers = {}
+    for selection in selections:
+        for pdf_url, selected_title in zip(selection["pdf_urls"], selection["titles"]):
+            unique_papers.setdefault(pdf_url, selected_title)
+    if not unique_papers:
         print("No papers selected.")
+        # Every candidate was considered and passed over, so the search may move on
+        commit_watermarks(search["watermarks"])
+        ledger.close()
         return
+    if len(pending_profiles) > 1:
+        total_selected = sum(len(selection["pdf_urls"]) for selection in selections)
+        print(f"{total_selected} selections across {len(pending_profiles)} profiles, {len(unique_papers)} unique papers")
+    for pdf_url, selected_title in unique_papers.items():
+        arxiv_id, version = parse_arxiv_id(pdf_url)
+        if arxiv_id:
+            ledger.mark_selected(arxiv_id, version, selected_title)
+
+    # Style references for the summaries: the reference articles plus every published digest
+    reference_index = ReferenceIndex(REFERENCE_INDEX_FILE)
+    sync_reference_index(reference_index, ledger)
 
     # List to keep track of downloaded PDF files
     downloaded_pdfs = []
 
-    # Process each selected paper
-    all_summaries = ""
-    for pdf_url, selected_title in zip(pdf_urls, selected_titles):
-        print(f"Selected Paper: {selected_title}")
-        arxiv_url = pdf_url.replace("/pdf/", "/abs/").rstrip(".pdf")
-        pdf_path = f"{pdf_url.split('/')[-1]}.pdf"
-        os.system(f"curl -L {pdf_url} -o {pdf_path}")
-        downloaded_pdfs.append(pdf_path)
-
-        # Process this specific paper
-        reference_text = read_reference_article(pdf_path)
-        if not reference_text:
-            print(f"Reference article {pdf_path} is missing or empty. Skipping...")
-            continue
+    # Process the selected papers as independent tasks; the semaphore caps how
+    # many run at once (1 reproduces the old one-paper-at-a-time behaviour)
+    semaphore = asyncio.Semaphore(max(1, max_concurrent_papers))
 
-        # Extract content and generate questions
-        paper_text = read_pdf_first_50_pages(pdf_path)
-        if not paper_text.strip():
-            print("Could not extract any text from the PDF.")
-            continue
-    
-        print("Generating questions based on the paper content...")
-        questions = await generate_questions_from_paper(paper_text, question_prompt_file)
-        
-        # Generate summary for this paper
-        print(f"\n=== Generating Summary for {selected_title} ===")
-        summary_output = await generate_summary_from_paper(paper_text, questions, summary_prompt_file, reference_text)
+    async def bounded_process_paper(http_client, pdf_extractor, pdf_url, selected_title):
+        queued_at = time.perf_counter()
+        async with semaphore:
+            run_metrics.record_queue_wait(time.perf_counter() - queued_at, "download")
+            return await process_paper(
+                http_client, pdf_extractor, pdf_url, selected_title, question_prompt_file, summary_prompt_file, editor_prompt_file, downloaded_pdfs, ledger, checkpoint, reference_index
+            )
 
-        print(f"Editing Summary for {selected_title}...")
-        edited_summary = await edit_summary(summary_output, editor_prompt_file)
-
-        all_summaries += f"=== Paper: {selected_title} ===\nArXiv URL: {arxiv_url}\n\n{edited_summary}\n\n"
+    # gather keeps results in selection order; return_exceptions stops one
+    # failing paper from cancelling the others. All downloads share one
+    # keep-alive connection pool, and PDFs are parsed once in a process pool.
+    async with contextlib.AsyncExitStack() as stack:
+        if http_client is None:
+            http_client = await stack.enter_async_context(create_http_client(max_connections=max(1, max_concurrent_papers)))
+        if pdf_extractor is None:
+            pdf_extractor = stack.enter_context(PdfExtractor(max_workers=max(1, max_concurrent_papers)))
+        results = await asyncio.gather(
+            *(
+                bounded_process_paper(http_client, pdf_extractor, pdf_url, selected_title)
+                for pdf_url, selected_title in unique_papers.items()
+            ),
+            return_exceptions=True,
+        )
+    results = dict(zip(unique_papers, results))
+    for pdf_url, result in results.items():
+        if isinstance(result, Exception):
+            print(f"Failed to process {unique_papers[pdf_url]}: {result}")
 
-    # Step 5: Email the summaries
-    print("Sending email with summaries...")
+    # Step 5: Email each profile its own digest, built from the shared summaries
     current_date = datetime.now().strftime("%Y-%m-%d")
-    await send_email(
-        subject=f"news_agent findings for {current_date} based on topics = {topics}",
-        body=all_summaries,
-        recipient_email=email,
-        sender_email=email,
-        sender_password=pswd,
-        main_call_id=main_call_id,
-        selection_call_id=selection_call_id
-    )
+    any_email_sent = False
+    # Whether every profile got its digest; until then the next run searches the same window again
+    all_delivered = True
+    for profile, selection in zip(pending_profiles, selections):
+        all_summaries = ""
+        digested_ids = []
+        for pdf_url in selection["pdf_urls"]:
+            result = results[pdf_url]
+            if result and not isinstance(result, Exception):
+                all_summaries += result
+                paper_id = parse_arxiv_id(pdf_url)
+                if paper_id[0]:
+                    digested_ids.append(paper_id)
+        if not all_summaries:
+            print(f"[{profile['name']}] No summaries to send.")
+            if selection["pdf_urls"]:
+                all_delivered = False
+            continue
+
+        print(f"[{profile['name']}] Sending email with summaries...")
+        with run_metrics.stage("email"):
+            email_sent = await send_email(
+                subject=f"news_agent findings for {current_date} based on topics = {profile['topics']}",
+                body=all_summaries,
+                recipient_email=profile["recipients"] or [sender_email],
+                sender_email=sender_email,
+                sender_password=sender_password,
+                main_call_id=main_call_id,
+                selection_call_id=selection["call_id"]
+            )
+        if email_sent:
+            any_email_sent = True
+            checkpoint.save(profile_stage("email", profile), {"sent": True, "papers": len(digested_ids)})
+            ledger.mark_emailed(digested_ids, ledger_profile(profile))
+        else:
+            all_delivered = False
+    if all_delivered:
+        commit_watermarks(search["watermarks"])
+    else:
+        print("Not every digest was delivered; the arXiv watermarks stay where they were")
+    if any_email_sent:
+        sync_reference_index(reference_index, ledger)
+    reference_index.close()
+    removed = ledger.compact(LEDGER_RETENTION_DAYS)
+    if removed:
+        print(f"Ledger compaction removed {removed} old entries")
+    ledger.close()
 
     for pdf_file in downloaded_pdfs:
         try:
@@ -310,5 +1045,68 @@ async def main():
             print(f"Failed to delete {pdf_file}: {e}")
 
 
-# Run the main function
-asyncio.run(main())
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Search arXiv, summarize the best papers and email a digest")
+    parser.add_argument("--topics", nargs="+", default=DEFAULT_TOPICS, help="arXiv search queries")
+    parser.add_argument("--max-results", type=int, default=DEFAULT_MAX_RESULTS, help="Results per topic")
+    parser.add_argument("--select-prompt", default=DEFAULT_SELECT_PROMPT_FILE, help="Paper selection prompt file")
+    parser.add_argument("--question-prompt", default=DEFAULT_QUESTION_PROMPT_FILE, help="Question generation prompt file")
+    parser.add_argument("--summary-prompt", default=DEFAULT_SUMMARY_PROMPT_FILE, help="Summary prompt file")
+    parser.add_argument("--editor-prompt", default=DEFAULT_EDITOR_PROMPT_FILE, help="Editor prompt file")
+    parser.add_argument("--recipients", nargs="+", help="Email recipients (default: the EMAIL sender)")
+    parser.add_argument("--profiles", metavar="FILE", help="JSON file of reader profiles (see profiles.py); replaces --topics and --recipients")
+    parser.add_argument("--max-concurrent-papers", type=int, help="Default: NEWS_AGENT_MAX_CONCURRENT_PAPERS or 5")
+    parser.add_argument("--full-refresh", action="store_true", help="Ignore the arXiv watermark and query cache")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a checkpointed run from runs/RUN_ID")
+    parser.add_argument("--no-telemetry", action="store_true", help="Skip W&B login and Weave tracing")
+    return parser.parse_args(argv)
+
+
+# Helper function: main() keyword arguments from the parsed command line
+def main_kwargs(args):
+    profiles = None
+    if args.profiles:
+        try:
+            profiles = load_profiles(args.profiles, args.select_prompt, args.max_results)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"Could not load profiles: {e}")
+    return dict(
+        topics=args.topics,
+        max_results=args.max_results,
+        select_prompt_file=args.select_prompt,
+        question_prompt_file=args.question_prompt,
+        summary_prompt_file=args.summary_prompt,
+        editor_prompt_file=args.editor_prompt,
+        recipients=args.recipients,
+        max_concurrent_papers=args.max_concurrent_papers,
+        full_refresh=args.full_refresh,
+        resume_run_id=args.resume,
+        profiles=profiles,
+    )
+
+
+# Helper function: Load secrets.env and the settings in it and, unless disabled, log in to W&B and start Weave
+def init_environment(args):
+    from dotenv import load_dotenv
+
+    # Load environment variables from secrets.env
+    load_dotenv(SECRETS_FILE)
+    load_settings()
+    if not args.no_telemetry:
+        enable_telemetry()
+
+
+def cli(argv=None):
+    args = parse_args(argv)
+    kwargs = main_kwargs(args)
+    init_environment(args)
+
+    asyncio.run(main(**kwargs))
+    if mailer is not None:
+        mailer.close_blocking()
+
+
+# Run the main function. The guard matters: PDF extraction workers re-import
+# this module when processes are spawned, and must not start another run.
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,186 @@
+# PDF text extraction service for the news agent
+# Parses each PDF once, in a process pool so several papers extract in
+# parallel without blocking the event loop, and caches the text on disk
+# keyed by the file's hash plus the page and token limits. Pages are read
+# lazily and reading stops at the token budget or the back matter.
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_CACHE_DIR = ".pdf_text_cache"
+DEFAULT_MAX_PAGES = 50
+# Bump when extraction output changes, so older cached texts are not reused
+EXTRACTION_VERSION = 2
+
+
+# Helper function: Hash a file's content in 1 MiB blocks
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Rough size of a token for English text, used to turn token budgets into characters
+CHARS_PER_TOKEN = 4
+# A line that is only a back-matter heading, e.g. "References", "7 REFERENCES",
+# "Appendix A", "Appendix B: Proofs" or "Acknowledgements". Case-sensitive and
+# without a trailing period, so wrapped body text such as "...listed in\n
+# Appendix B." or "...see the\nreferences therein." does not cut the paper short.
+BACK_MATTER_HEADING = re.compile(
+    r"^[ \t]*(?:\d+(?:\.\d+)*\.?[ \t]+)?"
+    r"(?:References|REFERENCES|Bibliography|BIBLIOGRAPHY|Appendices|APPENDICES"
+    r"|Acknowledge?ments?|ACKNOWLEDGE?MENTS?|Supplementary Material|SUPPLEMENTARY MATERIAL"
+    r"|(?:Appendix|APPENDIX)(?:[ \t]+[A-Z](?:\.\d+)*(?:[ \t]*[:.\u2014-]?[ \t]+[A-Z][^\n]{0,50}?)?)?)"
+    r"(?<!\.)[ \t]*$",
+    re.MULTILINE,
+)
+
+
+# Yield (page_text, seconds) for each page, parsing pages only as they are consumed
+def iter_pdf_pages(reader, max_pages=DEFAULT_MAX_PAGES):
+    for page in reader.pages[:max_pages]:
+        started = time.perf_counter()
+        text = page.extract_text() or ""
+        yield text, round(time.perf_counter() - started, 4)
+
+
+# Helper function: Find where the back matter starts on a page, or None
+def find_back_matter(page_text):
+    match = BACK_MATTER_HEADING.search(page_text)
+    return match.start() if match else None
+
+
+# Runs inside a worker process, so it must stay a top-level function
+def extract_pdf_pages(pdf_path, max_pages=DEFAULT_MAX_PAGES, max_chars=None, skip_back_matter=False):
+    """Read pages lazily until the page limit, the character budget or the back matter.
+
+    "stop_reason" is one of "end", "page_limit", "budget" or "back_matter";
+    "chars_truncated" counts characters dropped from the page the reader stopped
+    on, and "total_pages" - "pages_read" the pages never parsed.
+    """
+    from PyPDF2 import PdfReader
+
+    page_texts = []
+    page_timings = []
+    chars_kept = 0
+    chars_truncated = 0
+    stop_reason = "end"
+    with open(pdf_path, "rb") as file:
+        reader = PdfReader(file)
+        total_pages = len(reader.pages)
+        if total_pages > max_pages:
+            stop_reason = "page_limit"
+        for page_number, (text, seconds) in enumerate(iter_pdf_pages(reader, max_pages)):
+            page_timings.append(seconds)
+            # The first page never holds the back matter, but may list it in a table of contents
+            cut = find_back_matter(text) if skip_back_matter and page_number > 0 else None
+            if cut is not None:
+                chars_truncated = len(text) - cut
+                text = text[:cut]
+                stop_reason = "back_matter"
+            if max_chars is not None and chars_kept + len(text) > max_chars:
+                keep = max_chars - chars_kept
+                chars_truncated += len(text) - keep
+                text = text[:keep]
+                stop_reason = "budget"
+            page_texts.append(text)
+            chars_kept += len(text)
+            if stop_reason in ("back_matter", "budget"):
+                break
+
+    return {
+        "text": "\n".join(page_texts),
+        "page_timings": page_timings,
+        "pages_read": len(page_texts),
+        "total_pages": total_pages,
+        "chars_kept": chars_kept,
+        "chars_truncated": chars_truncated,
+        "estimated_tokens": chars_kept // CHARS_PER_TOKEN,
+        "stop_reason": stop_reason,
+    }
+
+
+class PdfExtractor:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_workers=None):
+        self.cache_dir = cache_dir
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _cache_path(self, file_hash, max_pages, max_chars, skip_back_matter):
+        return os.path.join(
+            self.cache_dir, f"{file_hash}_{max_pages}_{max_chars or 'all'}_{int(skip_back_matter)}_v{EXTRACTION_VERSION}.json"
+        )
+
+    def _load_cached(self, cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cached(self, cache_path, extraction):
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(extraction, file)
+        os.replace(tmp_path, cache_path)
+
+    async def extract(self, pdf_path, max_pages=DEFAULT_MAX_PAGES, max_tokens=None, skip_back_matter=False):
+        """Extract the text of the first `max_pages` pages of `pdf_path`.
+
+        With `max_tokens`, reading stops once roughly that many tokens of text
+        were collected; with `skip_back_matter`, it stops at the references or
+        appendix heading. Returns the extract_pdf_pages dict plus "cached".
+        Unreadable PDFs give an empty "text" (with stop_reason "error") instead of raising.
+        """
+        max_chars = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+        file_hash = await asyncio.to_thread(file_sha256, pdf_path)
+        cache_path = self._cache_path(file_hash, max_pages, max_chars, skip_back_matter)
+        cached = await asyncio.to_thread(self._load_cached, cache_path)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            extraction = await loop.run_in_executor(
+                self.executor, extract_pdf_pages, pdf_path, max_pages, max_chars, skip_back_matter
+            )
+        except Exception as e:
+            print(f"Could not extract text from {pdf_path}: {e}")
+            return {
+                "text": "",
+                "page_timings": [],
+                "pages_read": 0,
+                "total_pages": 0,
+                "chars_kept": 0,
+                "chars_truncated": 0,
+                "estimated_tokens": 0,
+                "stop_reason": "error",
+                "cached": False,
+            }
+
+        timings = extraction["page_timings"]
+        slowest = max(timings) if timings else 0.0
+        print(
+            f"Extracted {extraction['pages_read']}/{extraction['total_pages']} pages from {pdf_path} "
+            f"in {time.perf_counter() - started:.2f}s (slowest page {slowest:.2f}s), "
+            f"~{extraction['estimated_tokens']} tokens kept, stopped at {extraction['stop_reason']}"
+        )
+        await asyncio.to_thread(self._save_cached, cache_path, extraction)
+        return {**extraction, "cached": False}
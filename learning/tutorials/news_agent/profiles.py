@@ -0,0 +1,84 @@
+# Reader profiles for the news agent
+# A profile file describes several readers, each with their own topics,
+# selection prompt and recipients. One run searches the union of all topics
+# once, selects papers per profile, and digests every selected paper only
+# once, however many profiles picked it.
+#
+# Example profiles.json:
+# {
+#   "profiles": [
+#     {"name": "agents", "topics": ["AI agents", "agentic workflows"],
+#      "select_prompt": "select_research_prompt.txt", "recipients": ["me@example.com"]},
+#     {"name": "systems", "topics": ["LLM inference serving"], "max_results": 50,
+#      "recipients": ["infra-team@example.com", "cto@example.com"]}
+#   ]
+# }
+# Relative prompt paths are resolved against the profile file's directory.
+
+import json
+import os
+import re
+
+DEFAULT_PROFILE = "default"
+# Profile names end up in checkpoint file names
+PROFILE_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def make_profile(name, topics, select_prompt_file, recipients=None, max_results=20):
+    return {
+        "name": name,
+        "topics": list(topics),
+        "select_prompt_file": select_prompt_file,
+        "recipients": list(recipients or []),
+        "max_results": max_results,
+    }
+
+
+def load_profiles(path, default_select_prompt_file, default_max_results):
+    """Read and validate a profile file; raises ValueError on a bad entry."""
+    with open(path, "r") as file:
+        config = json.load(file)
+    entries = config.get("profiles") if isinstance(config, dict) else None
+    if not entries:
+        raise ValueError(f'{path}: expected {{"profiles": [...]}} with at least one profile')
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    profiles = []
+    seen = set()
+    for i, entry in enumerate(entries):
+        name = entry.get("name", "")
+        if not PROFILE_NAME.match(name) or name in seen:
+            raise ValueError(f"{path}: profile {i} needs a unique name of letters, digits, '-' or '_' (got {name!r})")
+        seen.add(name)
+        topics = entry.get("topics")
+        if not topics or not all(isinstance(topic, str) and topic.strip() for topic in topics):
+            raise ValueError(f"{path}: profile {name!r} needs a non-empty list of topics")
+        select_prompt_file = entry.get("select_prompt")
+        if select_prompt_file:
+            select_prompt_file = os.path.join(base_dir, select_prompt_file)
+        profiles.append(
+            make_profile(
+                name,
+                topics,
+                select_prompt_file or default_select_prompt_file,
+                entry.get("recipients"),
+                int(entry.get("max_results", default_max_results)),
+            )
+        )
+    return profiles
+
+
+# Helper function: The profile-specific name of a checkpoint stage ("selection" stays as is for the default profile)
+def profile_stage(stage, profile):
+    return stage if profile["name"] == DEFAULT_PROFILE else f"{stage}-{profile['name']}"
+
+
+# Helper function: Search results that matched at least one of the profile's topics
+def profile_candidates(possibilities, profile):
+    topics = set(profile["topics"])
+    return [paper for paper in possibilities if topics.intersection(paper.get("topics", []))]
+
+
+# Helper function: The ledger's delivery key for a profile (None keeps the single-reader behaviour)
+def ledger_profile(profile):
+    return None if profile["name"] == DEFAULT_PROFILE else profile["name"]
@@ -0,0 +1,57 @@
+# Prompt registry for the news agent
+# Prompt files are read once and re-read only when their mtime changes, instead
+# of on every call for every paper. Templates are rendered with named slots
+# ($paper_text, $article, ...; unknown $names are left alone, so plain prompt
+# files work unchanged).
+#
+# The layouts put static text first and per-call content last, so calls share
+# a long identical prefix that provider prompt caching can reuse (OpenAI caches
+# prefixes of 1024+ tokens). The per-paper calls (questions, then summary) both
+# start with the same preamble and paper text, so the summary call gets the
+# paper from the cache; selection rounds share the selection instructions.
+
+import os
+from string import Template
+
+# Shared, static start of every per-paper prompt
+PAPER_PREAMBLE = (
+    "You are helping to write a newsletter digest of a research paper. "
+    "The paper comes first; the task for this step follows it."
+)
+
+QUESTIONS_LAYOUT = Template("$paper_context\n\nTask:\n$instructions\n\nPlease provide a list of questions.")
+EDITOR_LAYOUT = Template("$instructions\n\nArticle Content:\n$article")
+SELECTION_LAYOUT = Template(
+    "$instructions\n\nRespond with ONLY the URLs of the papers you recommend, separated by commas, nothing else."
+    "\n\nSearch Results:\n$search_results"
+)
+
+
+# Helper function: The cacheable prefix shared by the per-paper prompts
+def paper_context(paper_text):
+    return f"{PAPER_PREAMBLE}\n\nPaper Content:\n{paper_text}"
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._templates = {}
+        self.loads = 0
+
+    def get(self, path):
+        """The text of the prompt file at `path`, re-read only after it changes."""
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._templates.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "r") as file:
+                cached = (mtime, file.read())
+            self._templates[path] = cached
+            self.loads += 1
+            print(f"Loaded prompt {path}")
+        return cached[1]
+
+    def render(self, path, layout=None, **slots):
+        """Fill the named slots of the prompt at `path`, then place it in `layout` as $instructions."""
+        instructions = Template(self.get(path)).safe_substitute(slots)
+        if layout is None:
+            return instructions
+        return layout.safe_substitute(slots, instructions=instructions)
@@ -0,0 +1,109 @@
+# Local relevance pre-ranking for arXiv candidates
+# Scores every candidate against the positive examples in the selection
+# prompt with TF-IDF cosine similarity (NumPy), subtracts a penalty for
+# similarity to the negative-preference list, and keeps the top K so the
+# LLM selection prompt stays small.
+
+import re
+
+NEGATIVE_LIST_MARKER = "beginning of negative preference list"
+DEFAULT_TOP_K = 40
+DEFAULT_NEGATIVE_WEIGHT = 0.5
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their this to was were "
+    "with we our us can via using based new how what which who why than then these those such more most".split()
+)
+
+
+# Helper function: Lowercase word tokens without stopwords
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+# Pull the example titles and characteristics out of select_research_prompt.txt
+def parse_selection_examples(prompt_text):
+    """Return (positive_examples, negative_examples) from the selection prompt.
+
+    Quoted titles and "- " characteristic bullets above the negative-preference
+    marker are positives; every non-empty line below the marker is a negative.
+    """
+    marker_at = prompt_text.lower().find(NEGATIVE_LIST_MARKER)
+    positive_part = prompt_text if marker_at == -1 else prompt_text[:marker_at]
+    negative_part = "" if marker_at == -1 else prompt_text[marker_at + len(NEGATIVE_LIST_MARKER):]
+
+    positives = []
+    for line in positive_part.splitlines():
+        line = line.strip()
+        if line.startswith('"') and line.endswith('"') and len(line) > 2:
+            positives.append(line.strip('"'))
+        elif line.startswith("- "):
+            positives.append(line[2:])
+    negatives = [line.strip().strip('"') for line in negative_part.splitlines() if line.strip().strip("#").strip()]
+    return positives, negatives
+
+
+def _tfidf_matrix(documents, vocabulary, idf):
+    import numpy as np
+
+    matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+    for row, tokens in enumerate(documents):
+        for token in tokens:
+            column = vocabulary.get(token)
+            if column is not None:
+                matrix[row, column] += 1.0
+    # Sublinear term frequency, then IDF weighting and L2 normalisation
+    np.log1p(matrix, out=matrix)
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def score_candidates(candidates, positives, negatives=(), negative_weight=DEFAULT_NEGATIVE_WEIGHT):
+    """Return one relevance score per candidate (higher is more relevant)."""
+    import numpy as np
+
+    candidate_tokens = [tokenize(f"{c['title']} {c['title']} {c['summary']}") for c in candidates]
+    positive_tokens = [tokenize(text) for text in positives]
+    negative_tokens = [tokenize(text) for text in negatives]
+
+    # IDF comes from the candidate pool: words every abstract uses carry no signal
+    vocabulary = {}
+    document_frequency = []
+    for tokens in candidate_tokens:
+        for token in set(tokens):
+            column = vocabulary.setdefault(token, len(vocabulary))
+            if column == len(document_frequency):
+                document_frequency.append(0)
+            document_frequency[column] += 1
+    if not vocabulary:
+        return np.zeros(len(candidates), dtype=np.float32)
+    idf = np.log((1 + len(candidates)) / (1 + np.asarray(document_frequency, dtype=np.float32))) + 1.0
+
+    candidate_matrix = _tfidf_matrix(candidate_tokens, vocabulary, idf)
+    scores = np.zeros(len(candidates), dtype=np.float32)
+    if positive_tokens:
+        positive_matrix = _tfidf_matrix(positive_tokens, vocabulary, idf)
+        # Mean similarity to the examples, plus the best single match
+        similarities = candidate_matrix @ positive_matrix.T
+        scores += similarities.mean(axis=1) + similarities.max(axis=1)
+    if negative_tokens:
+        negative_matrix = _tfidf_matrix(negative_tokens, vocabulary, idf)
+        scores -= negative_weight * (candidate_matrix @ negative_matrix.T).max(axis=1)
+    return scores
+
+
+def prerank_candidates(candidates, prompt_text, top_k=DEFAULT_TOP_K, negative_weight=DEFAULT_NEGATIVE_WEIGHT):
+    """Keep the `top_k` candidates most similar to the prompt's examples, best first.
+
+    A `top_k` of 0 or None disables pre-ranking.
+    """
+    if not top_k or len(candidates) <= top_k:
+        return list(candidates)
+    positives, negatives = parse_selection_examples(prompt_text)
+    scores = score_candidates(candidates, positives, negatives, negative_weight)
+    # Stable sort so ties keep the search order (newest first)
+    ranked = sorted(range(len(candidates)), key=lambda i: -float(scores[i]))
+    return [candidates[i] for i in ranked[:top_k]]
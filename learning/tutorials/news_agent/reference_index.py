@@ -0,0 +1,154 @@
+# Reference-article index for the news agent
+# Keeps past published digests and the hand-written reference articles
+# (article1.txt to article3.txt) in a SQLite FTS5 table. For each new paper
+# the summary stage retrieves the most similar article, trimmed to a budget,
+# as its style reference. Updates are incremental: files are re-read only when
+# their mtime changes, and digests are synced from the ledger by emailed time.
+
+import os
+import sqlite3
+import time
+from collections import Counter
+
+from ranking import tokenize
+
+DEFAULT_INDEX_FILE = "reference_index.sqlite3"
+DEFAULT_MAX_CHARS = 4000
+# Most frequent paper terms used as the search query
+QUERY_TERMS = 32
+
+KIND_REFERENCE = "reference"
+KIND_DIGEST = "digest"
+
+
+# Helper function: Cut an article to `max_chars`, at a paragraph break when possible
+def trim_article(text, max_chars=DEFAULT_MAX_CHARS):
+    text = text.strip()
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n\n", 0, max_chars)
+    if cut <= 0:
+        cut = text.rfind(" ", 0, max_chars)
+    return text[: cut if cut > 0 else max_chars].rstrip()
+
+
+# Helper function: An FTS5 query that ORs the most frequent terms of `text`
+def build_match_query(text, terms=QUERY_TERMS):
+    counts = Counter(token for token in tokenize(text) if not token.isdigit())
+    return " OR ".join(f'"{token}"' for token, _ in counts.most_common(terms))
+
+
+class ReferenceIndex:
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles USING fts5(
+                source UNINDEXED, kind UNINDEXED, title, body, tokenize = 'porter'
+            );
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                mtime REAL,
+                added_at REAL NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _mtime(self, source):
+        row = self.conn.execute("SELECT mtime FROM sources WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else None
+
+    def remove(self, source):
+        self.conn.execute("DELETE FROM articles WHERE source = ?", (source,))
+        self.conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+        self.conn.commit()
+
+    def add_article(self, source, title, body, kind=KIND_DIGEST, mtime=None):
+        """Index (or replace) one article; returns False when `mtime` shows it is unchanged."""
+        if mtime is not None and self._mtime(source) == mtime:
+            return False
+        self.conn.execute("DELETE FROM articles WHERE source = ?", (source,))
+        self.conn.execute(
+            "INSERT INTO articles (source, kind, title, body) VALUES (?, ?, ?, ?)", (source, kind, title or "", body)
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sources (source, kind, mtime, added_at) VALUES (?, ?, ?, ?)",
+            (source, kind, mtime, time.time()),
+        )
+        self.conn.commit()
+        return True
+
+    def add_files(self, paths, kind=KIND_REFERENCE):
+        """Index text files that are new or changed since the last call; returns how many were (re)indexed."""
+        indexed = 0
+        for path in paths:
+            source = os.path.abspath(path)
+            if not os.path.exists(path):
+                if self._mtime(source) is not None:
+                    self.remove(source)
+                continue
+            mtime = os.path.getmtime(path)
+            if self._mtime(source) == mtime:
+                continue
+            with open(path, "r") as file:
+                body = file.read().strip()
+            if not body:
+                # An empty placeholder file is not a usable reference
+                self.remove(source)
+                continue
+            indexed += self.add_article(source, body.splitlines()[0], body, kind, mtime)
+        return indexed
+
+    def sync_digests(self, rows):
+        """Index (source, title, summary, emailed_at) rows of published digests; returns how many were new."""
+        return sum(self.add_article(source, title, summary, KIND_DIGEST, emailed_at) for source, title, summary, emailed_at in rows)
+
+    def latest_mtime(self, kind=KIND_DIGEST):
+        row = self.conn.execute("SELECT MAX(mtime) FROM sources WHERE kind = ?", (kind,)).fetchone()
+        return row[0]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+
+    def best_match(self, text, max_chars=DEFAULT_MAX_CHARS, exclude=None):
+        """The indexed article most similar to `text`, trimmed to `max_chars`, or None.
+
+        Returns a dict with source, kind, title and text. Falls back to the most
+        recently added article when nothing shares a term with `text`.
+        """
+        query = build_match_query(text)
+        row = None
+        if query:
+            # bm25 is lower for better matches; titles count double
+            row = self.conn.execute(
+                """
+                SELECT source, kind, title, body FROM articles
+                WHERE articles MATCH ? AND source IS NOT ?
+                ORDER BY bm25(articles, 0.0, 0.0, 2.0, 1.0) LIMIT 1
+                """,
+                (query, exclude),
+            ).fetchone()
+        if row is None:
+            row = self.conn.execute(
+                """
+                SELECT a.source, a.kind, a.title, a.body FROM articles a JOIN sources s ON s.source = a.source
+                WHERE a.source IS NOT ? ORDER BY s.added_at DESC LIMIT 1
+                """,
+                (exclude,),
+            ).fetchone()
+        if row is None:
+            return None
+        source, kind, title, body = row
+        return {"source": source, "kind": kind, "title": title, "text": trim_article(body, max_chars)}
@@ -0,0 +1,235 @@
+# Rate-limit-aware scheduler in front of `acompletion`
+# Every LLM call goes through one shared scheduler that:
+#   - paces requests with token buckets for requests/minute and tokens/minute,
+#     using an estimate of each prompt's token cost before it is sent
+#   - retries 429 and 5xx errors with exponential backoff and full jitter
+#   - adapts its concurrency AIMD-style: halve on throttling, +1 after a
+#     window of successes
+#   - serves waiting calls by priority, so selection goes ahead of bulk summaries
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+CHARS_PER_TOKEN = 4
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+# Selection gates every paper, so it goes first; summaries are the bulk of the work
+STAGE_PRIORITIES = {
+    "select": PRIORITY_HIGH,
+    "questions": PRIORITY_NORMAL,
+    "edit": PRIORITY_NORMAL,
+    "summary": PRIORITY_BULK,
+    "digest": PRIORITY_BULK,
+}
+
+RETRYABLE_ERROR_NAMES = {
+    "RateLimitError",
+    "APIConnectionError",
+    "APITimeoutError",
+    "Timeout",
+    "ServiceUnavailableError",
+    "InternalServerError",
+}
+
+
+# Helper function: Estimate what a request counts against a tokens-per-minute limit
+def estimate_tokens(messages, max_tokens=0):
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    # Providers count the prompt plus the requested completion budget
+    return prompt_chars // CHARS_PER_TOKEN + 4 * len(messages) + (max_tokens or 0)
+
+
+# Helper function: HTTP status of a provider exception, if it carries one
+def error_status(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc):
+    status = error_status(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(exc).__name__ in RETRYABLE_ERROR_NAMES or isinstance(exc, (ConnectionError, asyncio.TimeoutError))
+
+
+def is_throttled(exc):
+    return error_status(exc) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+# Helper function: Seconds from a Retry-After header, if the exception carries one
+def retry_after_seconds(exc):
+    try:
+        value = getattr(exc, "response", None).headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute up to `capacity`; may go into debt."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    def time_until(self, amount):
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        # A request larger than the bucket could never run, so it only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate_per_second
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= amount
+
+
+class CompletionScheduler:
+    def __init__(
+        self,
+        completion_fn,
+        requests_per_minute=500,
+        tokens_per_minute=200_000,
+        max_concurrency=8,
+        min_concurrency=1,
+        max_retries=5,
+        base_backoff=1.0,
+        max_backoff=60.0,
+    ):
+        self.completion_fn = completion_fn
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._condition = asyncio.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._successes_since_change = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "errors": 0, "min_concurrency_seen": max_concurrency}
+
+    def _ready_in(self, estimated_tokens):
+        return max(
+            self._paused_until - time.monotonic(),
+            self.request_bucket.time_until(1),
+            self.token_bucket.time_until(estimated_tokens),
+        )
+
+    async def _acquire(self, priority, estimated_tokens):
+        entry = (priority, next(self._sequence))
+        async with self._condition:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    if self._waiting[0] == entry and self._in_flight < self.concurrency:
+                        wait = self._ready_in(estimated_tokens)
+                        if wait <= 0:
+                            heapq.heappop(self._waiting)
+                            self.request_bucket.consume(1)
+                            self.token_bucket.consume(estimated_tokens)
+                            self._in_flight += 1
+                            # The next caller in line may be able to go too
+                            self._condition.notify_all()
+                            return
+                        try:
+                            await asyncio.wait_for(self._condition.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await self._condition.wait()
+            except BaseException:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                self._condition.notify_all()
+                raise
+
+    async def _release(self, throttled=False, succeeded=False):
+        async with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.stats["throttled"] += 1
+                # Multiplicative decrease, at most once per second so a burst of 429s counts once
+                if now - self._last_decrease > 1.0:
+                    self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+                    self.stats["min_concurrency_seen"] = min(self.stats["min_concurrency_seen"], self.concurrency)
+                    self._last_decrease = now
+                self._successes_since_change = 0
+            elif succeeded:
+                # Additive increase after a full window of successful calls
+                self._successes_since_change += 1
+                if self._successes_since_change >= self.concurrency and self.concurrency < self.max_concurrency:
+                    self.concurrency += 1
+                    self._successes_since_change = 0
+            self._condition.notify_all()
+
+    def _backoff(self, attempt, exc):
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            return retry_after
+        # Full jitter: uniform between 0 and the exponential cap
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    async def submit(self, priority=PRIORITY_NORMAL, on_wait=None, on_retry=None, **kwargs):
+        """Call `completion_fn(**kwargs)` under the rate limits and return its response.
+
+        `on_wait(seconds)` is called with the time spent queued before each
+        attempt and `on_retry()` before each retry.
+        """
+        estimated_tokens = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+        for attempt in range(self.max_retries + 1):
+            queued_at = time.monotonic()
+            await self._acquire(priority, estimated_tokens)
+            if on_wait is not None:
+                on_wait(time.monotonic() - queued_at)
+            self.stats["requests"] += 1
+            try:
+                response = await self.completion_fn(**kwargs)
+            except Exception as exc:
+                throttled = is_throttled(exc)
+                await self._release(throttled=throttled)
+                if not is_retryable(exc) or attempt == self.max_retries:
+                    self.stats["errors"] += 1
+                    raise
+                delay = self._backoff(attempt, exc)
+                if throttled:
+                    # Everyone waits, not just this caller: the limit is shared
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self.stats["retries"] += 1
+                if on_retry is not None:
+                    on_retry()
+                print(f"LLM call failed ({type(exc).__name__}: {exc}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            await self._release(succeeded=True)
+            # Settle the token estimate against what the provider actually counted
+            usage = response.get("usage") if hasattr(response, "get") else None
+            actual = usage.get("total_tokens") if isinstance(usage, dict) else getattr(usage, "total_tokens", None)
+            if actual:
+                self.token_bucket.consume(actual - estimated_tokens)
+            return response
@@ -0,0 +1,132 @@
+# Summarization strategies for the news agent
+# "single" sends the paper in one prompt (the original behaviour);
+# "map_reduce" splits the paper into section-aware chunks, summarizes the
+# chunks concurrently with a cheap prompt, then runs one reduce call that
+# writes the article and answers the generated questions.
+
+import asyncio
+import re
+
+from prompts import paper_context
+
+DEFAULT_CHUNK_CHARS = 8000
+DEFAULT_MAX_FANOUT = 4
+# The reduce call only needs the reference for its style, not all of it
+DEFAULT_REFERENCE_CHARS = 4000
+
+# Numbered headings ("3 Method", "4.2 Ablations", "IV. Results") or common
+# unnumbered section names standing alone on a line
+SECTION_HEADING = re.compile(
+    r"^\s*(?:(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+[A-Z][^\n]{0,80}"
+    r"|(?:abstract|introduction|related work|background|methods?|methodology|approach"
+    r"|experiments?|evaluation|results|discussion|conclusions?|limitations)\s*:?)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+MAP_PROMPT = (
+    "You are an AI research assistant. Summarize the following excerpt of a research paper "
+    "in at most 150 words. Keep the concrete methods, numbers and results, and skip generic background.\n\n"
+    "Excerpt {index} of {total}:\n{chunk}"
+)
+
+
+# Helper function: The reference-article section of a summary prompt (empty without a reference)
+def reference_section(reference_text):
+    return f"PREVIOUS Reference Article:\n{reference_text}\n\n" if reference_text else ""
+
+
+# Build the original one-shot summary prompt. It starts with the same paper
+# context as the questions prompt, so that part is served from the provider cache.
+def build_summary_prompt(summary_prompt, reference_text, questions, paper_text):
+    return (
+        f"{paper_context(paper_text)}\n\nTask:\n{summary_prompt}\n\n{reference_section(reference_text)}"
+        f"List of Questions to address in the article:\n{questions}"
+    )
+
+
+# Build the reduce prompt from the per-chunk notes
+def build_reduce_prompt(summary_prompt, reference_text, questions, chunk_summaries):
+    notes = "\n\n".join(f"Part {i + 1}:\n{summary}" for i, summary in enumerate(chunk_summaries))
+    return (
+        f"{summary_prompt}\n\n{reference_section(reference_text)}"
+        f"Paper Content (condensed notes for each part of the paper, in order):\n{notes}\n\n"
+        f"List of Questions to address in the article:\n{questions}"
+    )
+
+
+# Helper function: Split text into sections at heading lines
+def split_sections(text):
+    starts = [match.start() for match in SECTION_HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(text)]
+    return [text[bounds[i]:bounds[i + 1]] for i in range(len(starts)) if text[bounds[i]:bounds[i + 1]].strip()]
+
+
+# Helper function: Split one oversized section on paragraph, then hard, boundaries
+def _split_long_section(section, chunk_chars):
+    pieces = []
+    current = ""
+    for paragraph in section.split("\n\n"):
+        while len(paragraph) > chunk_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(paragraph[:chunk_chars])
+            paragraph = paragraph[chunk_chars:]
+        if current and len(current) + len(paragraph) + 2 > chunk_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+# Pack whole sections into chunks of at most `chunk_chars` characters
+def chunk_paper(text, chunk_chars=DEFAULT_CHUNK_CHARS):
+    chunks = []
+    current = ""
+    for section in split_sections(text):
+        if len(section) > chunk_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_long_section(section, chunk_chars))
+            continue
+        if current and len(current) + len(section) > chunk_chars:
+            chunks.append(current)
+            current = ""
+        current += section
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+async def summarize_map_reduce(
+    paper_text,
+    questions,
+    summary_prompt,
+    reference_text,
+    infer,
+    chunk_chars=DEFAULT_CHUNK_CHARS,
+    max_fanout=DEFAULT_MAX_FANOUT,
+    reference_chars=DEFAULT_REFERENCE_CHARS,
+):
+    """Summarize a long paper with concurrent chunk summaries and one reduce call.
+
+    `infer` is an async callable taking a prompt string and returning the
+    completion text (run_inference in news_agent.py). At most `max_fanout`
+    chunk summaries run at the same time.
+    """
+    chunks = chunk_paper(paper_text, chunk_chars)
+    semaphore = asyncio.Semaphore(max(1, max_fanout))
+
+    async def summarize_chunk(index, chunk):
+        async with semaphore:
+            return await infer(MAP_PROMPT.format(index=index + 1, total=len(chunks), chunk=chunk))
+
+    chunk_summaries = await asyncio.gather(*(summarize_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+    print(f"Map-reduce summary: {len(chunks)} chunks of up to {chunk_chars} characters")
+    reduce_prompt = build_reduce_prompt(summary_prompt, reference_text[:reference_chars], questions, chunk_summaries)
+    return await infer(reduce_prompt)
@@ -0,0 +1,32 @@
+# Tests for the back-matter heading pattern in pdf_extract.py
+# Run with: python -m pytest test_pdf_extract.py
+
+import pytest
+
+from pdf_extract import find_back_matter
+
+
+@pytest.mark.parametrize(
+    "text, is_heading",
+    [
+        ("References", True),
+        ("7 References", True),
+        ("7. REFERENCES", True),
+        ("Appendix A", True),
+        ("Appendix B: Proofs of Theorem 1", True),
+        ("Acknowledgements", True),
+        ("Full hyperparameters are listed in\nAppendix B.", False),
+        ("We defer the proofs to the\nappendix for brevity.", False),
+        ("Related results, see the\nreferences therein.", False),
+        ("A references section follows.", False),
+        ("References.", False),
+        ("Appendix C of the supplementary material", False),
+    ],
+)
+def test_back_matter_heading(text, is_heading):
+    assert (find_back_matter(text) is not None) == is_heading
+
+
+def test_back_matter_starts_at_heading():
+    page = "5 Conclusion\nThe agent works.\n\nReferences\n[1] A. Author. A paper."
+    assert page[find_back_matter(page):].startswith("References")
@@ -1,18 +1,179 @@
 import os
 import sys
 import json
+import time
+import threading
 import subprocess
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
+DEFAULT_API_URL = 'https://api.github.com'
+DEFAULT_DESCRIPTION = 'LLM Agent Development Resources and Notes'
+
+GITIGNORE_CONTENT = """
+# Python
+__pycache__/
+*.py[cod]
+*$py.class
+*.so
+.Python
+env/
+build/
+develop-eggs/
+dist/
+downloads/
+eggs/
+.eggs/
+lib/
+lib64/
+parts/
+sdist/
+var/
+wheels/
+*.egg-info/
+.installed.cfg
+*.egg
+
+# VS Code
+.vscode/*
+!.vscode/settings.json
+!.vscode/tasks.json
+!.vscode/launch.json
+!.vscode/extensions.json
+*.code-workspace
+
+# OS
+.DS_Store
+.DS_Store?
+._*
+.Spotlight-V100
+.Trashes
+ehthumbs.db
+Thumbs.db
+"""
+
+
+class GitHubClient:
+    """GitHub API client shared by every project in a run: one pooled session, rate-limit aware"""
+
+    def __init__(self, token, api_url=None, pool_size=10, max_retries=5, min_write_interval=1.0):
+        self.api_url = (api_url or os.getenv('GITHUB_API_URL') or DEFAULT_API_URL).rstrip('/')
+        self.max_retries = max_retries
+        # GitHub asks for content-creating requests to be sent one at a time,
+        # at least a second apart, to stay clear of its secondary rate limits
+        self.min_write_interval = min_write_interval
+        self._write_lock = threading.Lock()
+        self._last_write = 0.0
+        self._login = None
+        self._login_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json'
+        })
+
+    def close(self):
+        self.session.close()
+
+    def _rate_limit_delay(self, response, attempt):
+        """Seconds to wait before retrying, or None if the response should not be retried"""
+        if response.status_code in (403, 429):
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                return float(retry_after)
+            if response.headers.get('X-RateLimit-Remaining') == '0':
+                reset = float(response.headers.get('X-RateLimit-Reset', time.time() + 60))
+                return max(1.0, reset - time.time())
+            if response.status_code == 429:
+                return 2 ** attempt
+            return None
+        if response.status_code >= 500:
+            return 2 ** attempt
+        return None
+
+    def request(self, method, path, **kwargs):
+        """Send an API request, waiting out rate limits and retrying server errors"""
+        url = f"{self.api_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            if method != 'GET':
+                with self._write_lock:
+                    wait = self._last_write + self.min_write_interval - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                    self._last_write = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=30, **kwargs)
+            except requests.ConnectionError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = 2 ** attempt
+                print(f"GitHub API connection failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+                continue
+            delay = self._rate_limit_delay(response, attempt)
+            if delay is None or attempt == self.max_retries:
+                return response
+            print(f"GitHub API returned {response.status_code}, retrying in {delay:.0f}s")
+            time.sleep(delay)
+        return response
+
+    def login(self):
+        """The authenticated user's login, fetched once"""
+        with self._login_lock:
+            if self._login is None:
+                response = self.request('GET', '/user')
+                response.raise_for_status()
+                self._login = response.json()['login']
+            return self._login
+
+    def create_repository(self, name, description=DEFAULT_DESCRIPTION, private=False):
+        """Create a repository and return its clone URL; an existing one of the same name is reused"""
+        data = {
+            'name': name,
+            'description': description,
+            'private': private,
+            'has_issues': True,
+            'has_projects': True,
+            'has_wiki': True
+        }
+        response = self.request('POST', '/user/repos', json=data)
+        if response.status_code == 201:
+            print(f"Created GitHub repository: {name}")
+            return response.json()['clone_url']
+        if response.status_code == 422:
+            existing = self.request('GET', f"/repos/{self.login()}/{name}")
+            if existing.status_code == 200:
+                print(f"GitHub repository already exists: {name}")
+                return existing.json()['clone_url']
+        print(f"Failed to create repository {name}: {response.text}")
+        return None
+
+
+def is_local_path(url):
+    return url.startswith('file://') or os.path.isabs(url)
+
+
 class WorkspaceManager:
-    def __init__(self, project_name, github_token=None):
+    def __init__(self, project_name, github_token=None, base_path=None, github=None, remote_template=None,
+                 description=DEFAULT_DESCRIPTION, private=False, api_url=None):
         self.project_name = project_name
         self.github_token = github_token or os.getenv('GITHUB_CEZAR_TOKEN')
-        self.base_path = Path.cwd()
+        self.base_path = Path(base_path) if base_path else Path.cwd()
         self.project_path = self.base_path / project_name
+        self.description = description
+        self.private = private
+        self.api_url = api_url
+        # Push somewhere other than the GitHub clone URL, e.g. "/srv/git/{name}.git"
+        self.remote_template = remote_template
+        self.github = github
 
     def create_workspace_file(self):
         """Create VS Code/Cursor workspace file"""
@@ -95,130 +256,188 @@ class WorkspaceManager:
         if not self.github_token:
             raise ValueError("GitHub token is required. Set GITHUB_CEZAR_TOKEN environment variable.")
 
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        
-        data = {
-            'name': self.project_name,
-            'description': 'LLM Agent Development Resources and Notes',
-            'private': False,
-            'has_issues': True,
-            'has_projects': True,
-            'has_wiki': True
-        }
-        
-        response = requests.post(
-            'https://api.github.com/user/repos',
-            headers=headers,
-            json=data
-        )
-        
-        if response.status_code == 201:
-            print(f"Created GitHub repository: {self.project_name}")
-            return response.json()['clone_url']
-        else:
-            print(f"Failed to create repository: {response.json()}")
-            return None
+        if self.github is None:
+            self.github = GitHubClient(self.github_token, self.api_url)
+        return self.github.create_repository(self.project_name, self.description, self.private)
+
+    def run_git(self, *args, check=True):
+        """Run a git command in the project directory, raising with git's error output if it fails"""
+        result = subprocess.run(['git', *args], cwd=self.project_path, capture_output=True, text=True)
+        if check and result.returncode != 0:
+            raise RuntimeError(f"git {' '.join(args)} failed in {self.project_path}: {result.stderr.strip()}")
+        return result
+
+    def is_provisioned(self):
+        """Whether the project is already committed and pushed to origin/main"""
+        if not (self.project_path / '.git').exists():
+            return False
+        head = self.run_git('rev-parse', '--verify', '-q', 'HEAD', check=False)
+        pushed = self.run_git('rev-parse', '--verify', '-q', 'refs/remotes/origin/main', check=False)
+        return head.returncode == 0 and head.stdout == pushed.stdout
+
+    def prepare_remote(self, remote_url):
+        """Create a local bare repository to push to, if the remote is a path that does not exist yet"""
+        if not is_local_path(remote_url):
+            return
+        path = Path(remote_url[len('file://'):] if remote_url.startswith('file://') else remote_url)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            result = subprocess.run(['git', 'init', '--bare', str(path)], capture_output=True, text=True)
+            if result.returncode != 0 and not (path / 'HEAD').exists():
+                raise RuntimeError(f"git init --bare {path} failed: {result.stderr.strip()}")
 
     def initialize_git(self, clone_url):
         """Initialize git repository and push initial commit"""
-        os.chdir(self.project_path)
-        
-        # Initialize git
-        subprocess.run(['git', 'init'])
-        
-        # Create .gitignore
-        gitignore_content = """
-# Python
-__pycache__/
-*.py[cod]
-*$py.class
-*.so
-.Python
-env/
-build/
-develop-eggs/
-dist/
-downloads/
-eggs/
-.eggs/
-lib/
-lib64/
-parts/
-sdist/
-var/
-wheels/
-*.egg-info/
-.installed.cfg
-*.egg
+        # Every step checks what is already there, so an interrupted setup can be rerun
+        if not (self.project_path / '.git').exists():
+            self.run_git('init')
 
-# VS Code
-.vscode/*
-!.vscode/settings.json
-!.vscode/tasks.json
-!.vscode/launch.json
-!.vscode/extensions.json
-*.code-workspace
-
-# OS
-.DS_Store
-.DS_Store?
-._*
-.Spotlight-V100
-.Trashes
-ehthumbs.db
-Thumbs.db
-"""
-        with open('.gitignore', 'w') as f:
-            f.write(gitignore_content)
+        # Create .gitignore
+        gitignore_path = self.project_path / '.gitignore'
+        if not gitignore_path.exists():
+            with open(gitignore_path, 'w') as f:
+                f.write(GITIGNORE_CONTENT)
 
         # Initial commit
-        subprocess.run(['git', 'add', '.'])
-        subprocess.run(['git', 'commit', '-m', 'Initial commit'])
-        
+        self.run_git('add', '.')
+        has_head = self.run_git('rev-parse', '--verify', '-q', 'HEAD', check=False).returncode == 0
+        if not has_head or self.run_git('diff', '--cached', '--quiet', check=False).returncode != 0:
+            self.run_git('commit', '-m', 'Initial commit' if not has_head else 'Update workspace')
+
         # Add remote and push
-        subprocess.run(['git', 'remote', 'add', 'origin', clone_url])
-        subprocess.run(['git', 'branch', '-M', 'main'])
-        subprocess.run(['git', 'push', '-u', 'origin', 'main'])
-        
+        if self.run_git('remote', 'get-url', 'origin', check=False).returncode == 0:
+            self.run_git('remote', 'set-url', 'origin', clone_url)
+        else:
+            self.run_git('remote', 'add', 'origin', clone_url)
+        self.run_git('branch', '-M', 'main')
+        self.run_git('push', '-u', 'origin', 'main')
+
         print("Initialized git repository and pushed initial commit")
 
     def setup_workspace(self):
-        """Run the complete workspace setup"""
+        """Run the complete workspace setup; returns 'created' or 'skipped'"""
         print(f"Setting up workspace for {self.project_name}")
-        
+        if self.is_provisioned():
+            print(f"{self.project_name} is already set up and pushed, skipping")
+            return 'skipped'
+
         # Create project directory
-        self.project_path.mkdir(exist_ok=True)
-        
+        self.project_path.mkdir(parents=True, exist_ok=True)
+
         # Create workspace file
         self.create_workspace_file()
-        
+
         # Create directory structure
         self.create_directory_structure()
-        
+
         # Create GitHub repository
-        clone_url = self.create_github_repository()
+        # With a remote template the GitHub API is only called when an API URL
+        # was given explicitly (e.g. a local mock), so pushing to local bare
+        # remotes never creates real repositories on github.com
+        clone_url = None
+        if not self.remote_template or self.api_url:
+            clone_url = self.create_github_repository()
+        if self.remote_template:
+            clone_url = self.remote_template.format(name=self.project_name)
+            self.prepare_remote(clone_url)
         if clone_url:
             self.initialize_git(clone_url)
-        
+        else:
+            raise RuntimeError(f"No remote repository for {self.project_name}")
+
         print("\nWorkspace setup complete!")
         print(f"To open in Cursor/VS Code, run: code {self.project_path / f'{self.project_name}.code-workspace'}")
+        return 'created'
+
+def load_manifest(path):
+    """Read a batch manifest: {"projects": [{"name": ..., "description": ..., "private": ...}]} or a list of names"""
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    entries = manifest.get('projects') if isinstance(manifest, dict) else manifest
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: expected a non-empty list of projects")
+
+    projects = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'name': entry}
+        if not isinstance(entry, dict) or not entry.get('name'):
+            raise ValueError(f"{path}: every project needs a name (got {entry!r})")
+        projects.append(entry)
+    names = [project['name'] for project in projects]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"{path}: duplicate project names {duplicates}")
+    return projects
+
+def provision_batch(projects, github_token=None, base_path=None, workers=4, api_url=None, remote_template=None):
+    """Set up several projects concurrently; returns {name: 'created' | 'skipped' | 'failed: ...'}"""
+    github_token = github_token or os.getenv('GITHUB_CEZAR_TOKEN')
+    uses_github = github_token and (not remote_template or api_url)
+    github = GitHubClient(github_token, api_url, pool_size=workers) if uses_github else None
+
+    def provision(project):
+        manager = WorkspaceManager(
+            project['name'],
+            github_token,
+            base_path=base_path,
+            github=github,
+            remote_template=remote_template,
+            description=project.get('description', DEFAULT_DESCRIPTION),
+            private=project.get('private', False),
+            api_url=api_url
+        )
+        try:
+            return manager.setup_workspace()
+        except Exception as e:
+            print(f"Error setting up {project['name']}: {e}")
+            return f"failed: {e}"
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(executor.map(provision, projects))
+    finally:
+        if github is not None:
+            github.close()
+    return {project['name']: result for project, result in zip(projects, results)}
 
 def main():
     parser = argparse.ArgumentParser(description='Setup workspace and GitHub repository')
-    parser.add_argument('project_name', help='Name of the project')
-    parser.add_argument('--token', help='GitHub token (or set GITHUB_CEZARTOKEN environment variable)')
-    
+    parser.add_argument('project_name', nargs='?', help='Name of the project')
+    parser.add_argument('--token', help='GitHub token (or set GITHUB_CEZAR_TOKEN environment variable)')
+    parser.add_argument('--manifest', help='JSON file listing several projects to set up concurrently')
+    parser.add_argument('--workers', type=int, default=4, help='Projects set up at the same time in batch mode')
+    parser.add_argument('--base-path', help='Directory to create projects in (default: current directory)')
+    parser.add_argument('--api-url', help=f'GitHub API base URL (default: GITHUB_API_URL or {DEFAULT_API_URL})')
+    parser.add_argument('--remote', help='Push to this remote instead of the GitHub clone URL; {name} is the project name. '
+                        'No GitHub repository is created unless --api-url is also given')
+
     args = parser.parse_args()
-    
+    if bool(args.project_name) == bool(args.manifest):
+        parser.error('give either a project name or --manifest')
+
     try:
-        manager = WorkspaceManager(args.project_name, args.token)
-        manager.setup_workspace()
+        if args.manifest:
+            results = provision_batch(
+                load_manifest(args.manifest),
+                args.token,
+                base_path=args.base_path,
+                workers=args.workers,
+                api_url=args.api_url,
+                remote_template=args.remote
+            )
+            print("\n=== Batch Summary ===")
+            for name, result in results.items():
+                print(f"{name}: {result}")
+            if any(result.startswith('failed') for result in results.values()):
+                sys.exit(1)
+        else:
+            manager = WorkspaceManager(args.project_name, args.token, base_path=args.base_path,
+                                       remote_template=args.remote, api_url=args.api_url)
+            manager.setup_workspace()
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()